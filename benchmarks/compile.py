@@ -0,0 +1,56 @@
+import argparse
+from pathlib import Path
+
+import ducktyped as dk
+from ducktyped.expressions import Expr
+from records import emit, measure
+
+
+def _wide_query(n_columns: int) -> dk.Query:
+    columns: list[Expr] = [
+        dk.col(f"c{i}").mul(2).add(i).alias(f"out{i}") for i in range(n_columns)
+    ]
+    return dk.SELECT(*columns).FROM(dk.TABLE(Path("prices.parquet")))
+
+
+def _deep_query(depth: int) -> dk.Query:
+    expr: Expr = dk.col.close
+    for i in range(depth):
+        expr = expr.add(i).mul(dk.col.open)
+    shared: Expr = expr.alias("deep")
+    return (
+        dk.SELECT(shared, expr.sub(1).alias("deep_minus_one"))
+        .FROM(dk.TABLE(Path("prices.parquet")))
+        .WHERE(expr.gt(0))
+    )
+
+
+def _compile(query: dk.Query) -> str:
+    query._parser = None
+    return query.explain()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args: argparse.Namespace = parser.parse_args()
+    cases: list[tuple[str, dk.Query]] = [
+        ("compile_columns_1000", _wide_query(n_columns=1000)),
+        ("compile_columns_5000", _wide_query(n_columns=5000)),
+        ("compile_depth_1000", _deep_query(depth=1000)),
+        ("compile_depth_10000", _deep_query(depth=10000)),
+    ]
+    for name, query in cases:
+        emit(
+            benchmark=name,
+            engine="ducktyped",
+            stage="compile",
+            rows=None,
+            tickers=None,
+            repeat=args.repeat,
+            timings=measure(func=lambda: _compile(query=query), repeat=args.repeat),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import polars as pl
+
+import ducktyped as dk
+from records import emit, measure
+
+_TICKER: str = "T0000"
+
+
+def _generate(directory: Path, rows: int, tickers: int) -> Path:
+    file: Path = directory.joinpath(f"ohlcv_{rows}_{tickers}.parquet")
+    if file.exists():
+        return file
+    directory.mkdir(parents=True, exist_ok=True)
+    duckdb.sql(
+        f"""
+        COPY (
+            SELECT
+                DATE '2000-01-01' + (i // {tickers})::INTEGER AS date,
+                'T' || lpad((i % {tickers})::VARCHAR, 4, '0') AS ticker,
+                100 + random() * 10 AS open,
+                110 + random() * 10 AS high,
+                90 + random() * 10 AS low,
+                100 + random() * 10 AS close,
+                (random() * 1e6)::BIGINT AS volume
+            FROM range({rows}) AS t(i)
+        ) TO '{file}' (FORMAT PARQUET)
+        """
+    )
+    return file
+
+
+def _filter_query(table: dk.TABLE) -> dk.Query:
+    return dk.SELECT(dk.col.date, dk.col.ticker, dk.col.close).FROM(table).WHERE(
+        dk.col.ticker.eq(_TICKER)
+    )
+
+
+def _group_query(table: dk.TABLE) -> dk.Query:
+    return (
+        dk.SELECT(
+            dk.col.ticker,
+            dk.col.close.mean().alias("avg_close"),
+            dk.col.volume.sum().alias("total_volume"),
+        )
+        .FROM(table)
+        .GROUP_BY(dk.col.ticker)
+    )
+
+
+def _rolling_query(table: dk.TABLE) -> dk.Query:
+    return dk.SELECT(
+        dk.col.date,
+        dk.col.ticker,
+        dk.col.close.rolling_mean(20)
+        .over(dk.col.ticker, order_by=dk.col.date)
+        .alias("ma_20"),
+    ).FROM(table)
+
+
+def _filter_sql(file: Path) -> str:
+    return f"SELECT date, ticker, close FROM '{file}' WHERE ticker = '{_TICKER}'"
+
+
+def _group_sql(file: Path) -> str:
+    return (
+        "SELECT ticker, avg(close) AS avg_close, sum(volume) AS total_volume "
+        f"FROM '{file}' GROUP BY ticker"
+    )
+
+
+def _rolling_sql(file: Path) -> str:
+    return (
+        "SELECT date, ticker, avg(close) OVER (PARTITION BY ticker ORDER BY date "
+        f"ROWS BETWEEN 20 PRECEDING AND CURRENT ROW) AS ma_20 FROM '{file}'"
+    )
+
+
+def _filter_polars(file: Path) -> pl.DataFrame:
+    return (
+        pl.scan_parquet(file)
+        .select(pl.col("date"), pl.col("ticker"), pl.col("close"))
+        .filter(pl.col("ticker") == _TICKER)
+        .collect()
+    )
+
+
+def _group_polars(file: Path) -> pl.DataFrame:
+    return (
+        pl.scan_parquet(file)
+        .group_by("ticker")
+        .agg(
+            pl.col("close").mean().alias("avg_close"),
+            pl.col("volume").sum().alias("total_volume"),
+        )
+        .collect()
+    )
+
+
+def _rolling_polars(file: Path) -> pl.DataFrame:
+    return (
+        pl.scan_parquet(file)
+        .select(
+            pl.col("date"),
+            pl.col("ticker"),
+            pl.col("close")
+            .rolling_mean(window_size=21, min_samples=1)
+            .over("ticker", order_by="date")
+            .alias("ma_20"),
+        )
+        .collect()
+    )
+
+
+_CASES: list[
+    tuple[
+        str,
+        Callable[[dk.TABLE], dk.Query],
+        Callable[[Path], str],
+        Callable[[Path], pl.DataFrame],
+    ]
+] = [
+    ("filter", _filter_query, _filter_sql, _filter_polars),
+    ("group_by", _group_query, _group_sql, _group_polars),
+    ("rolling", _rolling_query, _rolling_sql, _rolling_polars),
+]
+
+
+def _compile(query: dk.Query) -> str:
+    query._parser = None
+    return query.explain()
+
+
+def _run(rows: int, tickers: int, directory: Path, repeat: int) -> None:
+    file: Path = _generate(directory=directory, rows=rows, tickers=tickers)
+    table: dk.TABLE = dk.TABLE(file)
+    connection: duckdb.DuckDBPyConnection = duckdb.connect()
+    for name, build, sql, scan in _CASES:
+        query: dk.Query = build(table)
+        measures: list[tuple[str, str, Callable[[], Any]]] = [
+            ("ducktyped", "construct", lambda: build(table)),
+            ("ducktyped", "compile", lambda: _compile(query=query)),
+            ("ducktyped", "execute", lambda: build(table).execute_to_pl()),
+            ("duckdb", "execute", lambda: connection.sql(sql(file)).pl()),
+            ("polars", "execute", lambda: scan(file)),
+        ]
+        for engine, stage, func in measures:
+            emit(
+                benchmark=name,
+                engine=engine,
+                stage=stage,
+                rows=rows,
+                tickers=tickers,
+                repeat=repeat,
+                timings=measure(func=func, repeat=repeat),
+            )
+    connection.close()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000]
+    )
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 5000])
+    parser.add_argument("--directory", type=Path, default=Path("benchmarks/data"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args: argparse.Namespace = parser.parse_args()
+    for rows in args.rows:
+        for tickers in args.tickers:
+            _run(rows=rows, tickers=tickers, directory=args.directory, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+VERSIONS: dict[str, str] = {
+    "python": platform.python_version(),
+    "duckdb": duckdb.__version__,
+    "polars": pl.__version__,
+    "pyarrow": pa.__version__,
+}
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "max_s": max(timings),
+    }
+
+
+def emit(
+    benchmark: str,
+    engine: str,
+    stage: str,
+    rows: int | None,
+    tickers: int | None,
+    repeat: int,
+    timings: dict[str, float],
+) -> None:
+    record: dict[str, Any] = {
+        "benchmark": benchmark,
+        "engine": engine,
+        "stage": stage,
+        "rows": rows,
+        "tickers": tickers,
+        "repeat": repeat,
+        **timings,
+        "versions": VERSIONS,
+    }
+    print(json.dumps(record), flush=True)
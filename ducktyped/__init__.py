@@ -1,4 +1,7 @@
-from ducktyped.main import SELECT, TABLE, Query, all, col
+from ducktyped.cache import ResultCache
+from ducktyped.main import SELECT, TABLE, Query, all, batch, col, gather, set_preview_rows
+from ducktyped.profiling import OperatorProfile, Profile, Usage, set_profile_hook
+from ducktyped.session import Resources, Session
 from ducktyped.types import (
     Date,
     Datetime,
@@ -25,6 +28,9 @@ __all__ = [
     "UInt32",
     "String",
     "Query",
+    "Session",
+    "Resources",
+    "ResultCache",
     "all",
     "Enum",
     "SELECT",
@@ -33,4 +39,11 @@ __all__ = [
     "Date",
     "Datetime",
     "col",
+    "gather",
+    "batch",
+    "Profile",
+    "OperatorProfile",
+    "Usage",
+    "set_profile_hook",
+    "set_preview_rows",
 ]
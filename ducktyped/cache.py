@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from ducktyped.lazy import LazyModule
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+else:
+    pa = LazyModule(name="pyarrow")
+
+_STAMPS_KEY: bytes = b"ducktyped.stamps"
+
+
+class FileStamp(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+
+
+def file_stamps(paths: list[Path]) -> tuple[FileStamp, ...]:
+    stamps: list[FileStamp] = []
+    for path in paths:
+        stat: os.stat_result = path.stat()
+        stamps.append(
+            FileStamp(path=str(path), mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        )
+    return tuple(stamps)
+
+
+class _Entry(NamedTuple):
+    stamps: tuple[FileStamp, ...]
+    table: pa.Table
+
+
+class ResultCache:
+    __slots__ = ("_max_bytes", "_directory", "_entries", "_size", "_lock")
+
+    def __init__(self, max_bytes: int, directory: Path | None) -> None:
+        self._max_bytes: int = max_bytes
+        self._directory: Path | None = directory
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._size: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> Path | None:
+        if self._directory is None:
+            return None
+        digest: str = hashlib.sha256(key.encode()).hexdigest()
+        return self._directory.joinpath(f"{digest}.arrow")
+
+    def get(self, key: str, stamps: tuple[FileStamp, ...]) -> pa.Table | None:
+        with self._lock:
+            entry: _Entry | None = self._entries.get(key)
+            if entry is not None:
+                if entry.stamps == stamps:
+                    self._entries.move_to_end(key)
+                    return entry.table
+                self._evict(key=key)
+        file: Path | None = self._file(key=key)
+        if file is None or not file.exists():
+            return None
+        table: pa.Table = pa.ipc.open_file(pa.memory_map(str(file))).read_all()
+        metadata: dict[bytes, bytes] = table.schema.metadata or {}
+        stored: list[list[str | int]] = json.loads(metadata.get(_STAMPS_KEY, b"[]"))
+        if tuple(FileStamp(*stamp) for stamp in stored) != stamps:
+            file.unlink(missing_ok=True)
+            return None
+        os.utime(file)
+        table = table.replace_schema_metadata(None)
+        with self._lock:
+            self._store(key=key, entry=_Entry(stamps=stamps, table=table))
+        return table
+
+    def put(self, key: str, stamps: tuple[FileStamp, ...], table: pa.Table) -> None:
+        with self._lock:
+            self._store(key=key, entry=_Entry(stamps=stamps, table=table))
+        file: Path | None = self._file(key=key)
+        if file is None or table.nbytes > self._max_bytes:
+            return
+        schema: pa.Schema = table.schema.with_metadata(
+            {_STAMPS_KEY: json.dumps(stamps).encode()}
+        )
+        tmp: Path = file.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                writer.write_table(table.replace_schema_metadata(schema.metadata))
+        tmp.replace(file)
+        self._trim(directory=file.parent)
+
+    def _trim(self, directory: Path) -> None:
+        files: list[tuple[int, int, Path]] = []
+        for file in directory.glob("*.arrow"):
+            try:
+                stat: os.stat_result = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, file))
+        size: int = sum(file_size for _, file_size, _ in files)
+        for _, file_size, file in sorted(files):
+            if size <= self._max_bytes:
+                return
+            file.unlink(missing_ok=True)
+            size -= file_size
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        if key in self._entries:
+            self._evict(key=key)
+        if entry.table.nbytes > self._max_bytes:
+            return
+        self._entries[key] = entry
+        self._size += entry.table.nbytes
+        while self._size > self._max_bytes:
+            oldest: tuple[str, _Entry] = self._entries.popitem(last=False)
+            self._size -= oldest[1].table.nbytes
+
+    def _evict(self, key: str) -> None:
+        entry: _Entry = self._entries.pop(key)
+        self._size -= entry.table.nbytes
@@ -8,8 +8,8 @@ class Col(Expr):
     _name: str
     table: str | None = None
 
-    def to_sql(self) -> str:
-        return self.name
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (self.name,)
 
     def rolling_mean(self, window_size: int) -> "RollingExprBuilder":
         return RollingExprBuilder(
@@ -73,24 +73,33 @@ class WindowExpr(Expr):
     partition_by: list[Col]
     order_by: Col | None = None
 
-    def to_sql(self) -> str:
-        partition_clause: str = ""
+    def spec(self) -> str:
+        clauses: list[str] = []
         if self.partition_by:
-            partition_clause = f"{Context.PARTITION_BY} " + ", ".join(c.name for c in self.partition_by)
-        order_by_clause: str = ""
+            partition: str = ", ".join(c.name for c in self.partition_by)
+            clauses.append(f"{Context.PARTITION_BY} {partition}")
         if self.order_by:
-            order_by_clause = f"{Context.ORDER_BY} {self.order_by.name}"
-        clauses: list[str] = []
-
-        if partition_clause:
-            clauses.append(partition_clause)
-        if order_by_clause:
-            clauses.append(order_by_clause)
-        window_clause: str = " ".join(clauses)
-        return (
-            f"{self.func}({self.col.name}) {Context.OVER} ("
-            f"{window_clause} ROWS {KeyWord.BETWEEN} {self.window_size} {KeyWord.PRECEDING} {KeyWord.AND} {KeyWord.CURRENT} ROW)"
-        )
+            clauses.append(f"{Context.ORDER_BY} {self.order_by.name}")
+        return " ".join(clauses)
+
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return self._window_parts(windows={})
+
+    def _window_parts(self, windows: dict[str, str]) -> tuple[Expr | str, ...]:
+        frame: str = f"ROWS {KeyWord.BETWEEN} {self.window_size} {KeyWord.PRECEDING} {KeyWord.AND} {KeyWord.CURRENT} ROW"
+        name: str | None = windows.get(self.spec())
+        if name is not None:
+            return (f"{self.func}(", self.col, f") {Context.OVER} ({name} {frame})")
+        parts: list[Expr | str] = [f"{self.func}(", self.col, f") {Context.OVER} ("]
+        for i, col in enumerate(self.partition_by):
+            parts.append(", " if i else f"{Context.PARTITION_BY} ")
+            parts.append(col)
+        if self.order_by:
+            if self.partition_by:
+                parts.append(" ")
+            parts.extend((f"{Context.ORDER_BY} ", self.order_by))
+        parts.append(f" {frame})")
+        return tuple(parts)
 
 @dataclass(slots=True)
 class RollingExprBuilder:
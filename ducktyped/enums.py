@@ -9,8 +9,17 @@ class Context(StrEnum):
     SELECT = "SELECT"
     WHERE = "WHERE"
     GROUP_BY = "GROUP BY"
+    WINDOW = "WINDOW"
+    WITH = "WITH"
+    UNION_ALL_BY_NAME = "UNION ALL BY NAME"
+    LIMIT = "LIMIT"
+    OFFSET = "OFFSET"
 
-JoinTypes = Literal["INNER", "LEFT", "RIGHT", "FULL"]
+JoinTypes = Literal["INNER", "LEFT", "RIGHT", "FULL", "ASOF", "ASOF LEFT"]
+
+ParquetCompression = Literal["snappy", "gzip", "zstd", "lz4", "brotli", "uncompressed"]
+
+CsvCompression = Literal["none", "gzip", "zstd"]
 
 class KeyWord(StrEnum):
     AND = "AND"
@@ -25,6 +34,7 @@ class KeyWord(StrEnum):
     IN = "IN"
     ASC = "ASC"
     DESC = "DESC"
+    MATERIALIZED = "MATERIALIZED"
 
 
 class Operators(StrEnum):
@@ -38,6 +48,7 @@ class Operators(StrEnum):
     LTE = "<="
     EQ = "="
     NEQ = "!="
+    AND = "AND"
 
 class Types(StrEnum):
     VARCHAR = "VARCHAR"
@@ -74,3 +85,16 @@ class Functions(StrEnum):
     SQRT = auto()
     FIRST = auto()
     LAST = auto()
+
+
+class Readers(StrEnum):
+    READ_PARQUET = auto()
+    READ_CSV = auto()
+
+
+class TypeFamily(StrEnum):
+    NUMERIC = auto()
+    STRING = auto()
+    TEMPORAL = auto()
+    BOOLEAN = auto()
+    OTHER = auto()
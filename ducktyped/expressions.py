@@ -1,9 +1,36 @@
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from typing import Any
+from datetime import date
+from itertools import count
+from typing import Any, NamedTuple
 
-from ducktyped.enums import Functions, KeyWord, Operators
+from ducktyped.enums import Context, Functions, KeyWord, Operators
 from ducktyped.types import DuckType
 
+IN_RELATION_THRESHOLD: int = 1000
+IN_RELATION_COLUMN: str = "__value"
+_relation_ids: Iterator[int] = count()
+
+
+def literal_sql(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str | date):
+        escaped: str = str(value).replace("'", "''")
+        return f"'{escaped}'"
+    return str(value)
+
+
+def _is_array(value: Any) -> bool:
+    return hasattr(value, "__array__") and hasattr(value, "__len__")
+
+
+def _array_values(values: Any) -> list[Any]:
+    for method in ("to_pylist", "to_list", "tolist"):
+        if hasattr(values, method):
+            return getattr(values, method)()
+    return list(values)
+
 
 def _wrap_value(value: Any) -> "Expr":
     if isinstance(value, Expr):
@@ -21,9 +48,15 @@ class Expr:
             return self._name
         return f"{self.table}.{self._name}"
 
-    def to_sql(self) -> str:
+    def _parts(self) -> tuple["Expr | str", ...]:
         raise NotImplementedError()
 
+    def _window_parts(self, windows: dict[str, str]) -> tuple["Expr | str", ...]:
+        return self._parts()
+
+    def to_sql(self, params: list[Any]) -> str:
+        return Compiler(roots=(self,), windows={}).compile(root=self, params=params)
+
     def alias(self, name: str) -> "AliasExpr":
         return AliasExpr(table=self.table, _expr=self, _alias=f"{name}")
 
@@ -145,7 +178,23 @@ class Expr:
     def last(self) -> "AggExpr":
         return AggExpr(table=self.table, _func=Functions.LAST, _expr=self)
 
-    def is_in(self, *values: Any) -> "InExpr":
+    def is_in(self, *values: Any) -> "InExpr | InRelationExpr":
+        if len(values) == 1 and _is_array(value=values[0]):
+            if len(values[0]) > IN_RELATION_THRESHOLD:
+                return InRelationExpr(
+                    table=self.table,
+                    _expr=self,
+                    _values=values[0],
+                    _relation=f"__in_{next(_relation_ids)}",
+                )
+            return InExpr(table=self.table, _expr=self, _values=_array_values(values[0]))
+        if len(values) > IN_RELATION_THRESHOLD:
+            return InRelationExpr(
+                table=self.table,
+                _expr=self,
+                _values=list(values),
+                _relation=f"__in_{next(_relation_ids)}",
+            )
         return InExpr(table=self.table, _expr=self, _values=list(values))
 
 
@@ -155,8 +204,8 @@ class AliasExpr(Expr):
     _expr: Expr
     _alias: str
 
-    def to_sql(self) -> str:
-        return f"{self._expr.to_sql()} AS {self._alias}"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (self._expr, f" {KeyWord.AS} {self._alias}")
 
 
 @dataclass(slots=True)
@@ -165,9 +214,11 @@ class CastExpr(Expr):
     _expr: Expr
     _dtype: DuckType
 
-    def to_sql(self) -> str:
+    def _parts(self) -> tuple[Expr | str, ...]:
         return (
-            f"{KeyWord.CAST}({self._expr.to_sql()} {KeyWord.AS} {self._dtype.to_sql()})"
+            f"{KeyWord.CAST}(",
+            self._expr,
+            f" {KeyWord.AS} {self._dtype.to_sql()})",
         )
 
 
@@ -175,10 +226,8 @@ class CastExpr(Expr):
 class LiteralExpr(Expr):
     _value: Any
 
-    def to_sql(self) -> str:
-        if isinstance(self._value, str):
-            return f"'{self._value}'"
-        return str(self._value)
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return ("?",)
 
 
 @dataclass(slots=True)
@@ -187,8 +236,8 @@ class UnaryFuncExpr(Expr):
     _func: str
     _expr: Expr
 
-    def to_sql(self) -> str:
-        return f"{self._func}({self._expr.to_sql()})"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (f"{self._func}(", self._expr, ")")
 
 
 @dataclass(slots=True)
@@ -198,8 +247,8 @@ class BinaryOpExpr(Expr):
     _op: Operators
     _right: Expr
 
-    def to_sql(self) -> str:
-        return f"({self._left.to_sql()} {self._op} {self._right.to_sql()})"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return ("(", self._left, f" {self._op} ", self._right, ")")
 
 
 @dataclass(slots=True)
@@ -209,16 +258,22 @@ class ClipExpr(Expr):
     _min_val: float | int
     _max_val: float | int
 
-    def to_sql(self) -> str:
-        min_expr: str = _wrap_value(value=self._min_val).to_sql()
-        max_expr: str = _wrap_value(value=self._max_val).to_sql()
-        return f"{KeyWord.LEAST}({KeyWord.GREATEST}({self._expr.to_sql()}, {min_expr}), {max_expr})"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (
+            f"{KeyWord.LEAST}({KeyWord.GREATEST}(",
+            self._expr,
+            ", ",
+            _wrap_value(value=self._min_val),
+            "), ",
+            _wrap_value(value=self._max_val),
+            ")",
+        )
 
 
 @dataclass(slots=True)
 class AllExpr(Expr):
-    def to_sql(self) -> str:
-        return "*"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return ("*",)
 
 
 @dataclass(slots=True)
@@ -227,8 +282,8 @@ class AggExpr(Expr):
     _func: str
     _expr: Expr
 
-    def to_sql(self) -> str:
-        return f"{self._func}({self._expr.to_sql()})"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (f"{self._func}(", self._expr, ")")
 
 
 @dataclass(slots=True)
@@ -237,7 +292,95 @@ class InExpr(Expr):
     _expr: Expr
     _values: list[Any]
 
-    def to_sql(self) -> str:
-        value_exprs: list[Expr] = [_wrap_value(v) for v in self._values]
-        values_str: str = ", ".join(v.to_sql() for v in value_exprs)
-        return f"{self._expr.to_sql()} {KeyWord.IN} ({values_str})"
+    def _parts(self) -> tuple[Expr | str, ...]:
+        parts: list[Expr | str] = [self._expr, f" {KeyWord.IN} ("]
+        for i, value in enumerate(self._values):
+            if i:
+                parts.append(", ")
+            parts.append(_wrap_value(value=value))
+        parts.append(")")
+        return tuple(parts)
+
+
+@dataclass(slots=True, eq=False)
+class InRelationExpr(Expr):
+    table: str | None
+    _expr: Expr
+    _values: Any
+    _relation: str
+
+    def _parts(self) -> tuple[Expr | str, ...]:
+        return (
+            self._expr,
+            f" {KeyWord.IN} ({Context.SELECT} {IN_RELATION_COLUMN} {Context.FROM} {self._relation})",
+        )
+
+
+def walk(roots: Iterable[Expr]) -> Iterator[Expr]:
+    seen: set[int] = set()
+    stack: list[Expr] = list(roots)[::-1]
+    while stack:
+        node: Expr = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(part for part in reversed(node._parts()) if isinstance(part, Expr))
+
+
+class _Fragment(NamedTuple):
+    sql: str
+    params: tuple[Any, ...]
+
+
+class _End(NamedTuple):
+    expr: Expr
+    out_start: int
+    params_start: int
+
+
+class Compiler:
+    __slots__ = ("_windows", "_shared", "_fragments")
+
+    def __init__(self, roots: Iterable[Expr], windows: dict[str, str]) -> None:
+        self._windows: dict[str, str] = windows
+        seen: set[int] = set()
+        self._shared: set[int] = set()
+        self._fragments: dict[int, _Fragment] = {}
+        stack: list[Expr] = list(roots)
+        while stack:
+            node: Expr = stack.pop()
+            if isinstance(node, LiteralExpr):
+                continue
+            if id(node) in seen:
+                self._shared.add(id(node))
+                continue
+            seen.add(id(node))
+            stack.extend(part for part in node._parts() if isinstance(part, Expr))
+
+    def compile(self, root: Expr, params: list[Any]) -> str:
+        out: list[str] = []
+        stack: list[Expr | str | _End] = [root]
+        while stack:
+            item: Expr | str | _End = stack.pop()
+            if isinstance(item, str):
+                out.append(item)
+            elif isinstance(item, _End):
+                self._fragments[id(item.expr)] = _Fragment(
+                    sql="".join(out[item.out_start :]),
+                    params=tuple(params[item.params_start :]),
+                )
+            elif isinstance(item, LiteralExpr):
+                out.append("?")
+                params.append(item._value)
+            elif id(item) in self._fragments:
+                fragment: _Fragment = self._fragments[id(item)]
+                out.append(fragment.sql)
+                params.extend(fragment.params)
+            else:
+                if id(item) in self._shared:
+                    stack.append(
+                        _End(expr=item, out_start=len(out), params_start=len(params))
+                    )
+                stack.extend(reversed(item._window_parts(windows=self._windows)))
+        return "".join(out)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ducktyped.lazy import LazyModule
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+else:
+    pa = LazyModule(name="pyarrow")
+
+_QUERY_KEY: bytes = b"ducktyped.query"
+_PARTS_KEY: bytes = b"ducktyped.parts"
+_TAIL: str = "tail.arrow"
+
+
+def _read(file: Path) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(str(file))).read_all()
+
+
+def _write(file: Path, table: pa.Table) -> None:
+    tmp: Path = file.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    tmp.replace(file)
+
+
+class IncrementalState:
+    __slots__ = ("_directory", "_query", "_parts")
+
+    def __init__(self, directory: Path, query: str) -> None:
+        self._directory: Path = directory
+        self._query: str = query
+        self._parts: int = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def _part(self, index: int) -> Path:
+        return self._directory.joinpath(f"output-{index:08d}.arrow")
+
+    def tail(self) -> pa.Table | None:
+        file: Path = self._directory.joinpath(_TAIL)
+        if not file.exists():
+            return None
+        table: pa.Table = _read(file=file)
+        metadata: dict[bytes, bytes] = table.schema.metadata or {}
+        if metadata.get(_QUERY_KEY, b"").decode() != self._query:
+            raise ValueError(
+                f"{self._directory} holds the state of another query: {metadata.get(_QUERY_KEY, b'').decode()}"
+            )
+        self._parts = json.loads(metadata[_PARTS_KEY])
+        return table.replace_schema_metadata(None)
+
+    def output(self) -> list[pa.Table]:
+        return [_read(file=self._part(index=index)) for index in range(self._parts)]
+
+    def append(self, result: pa.Table, tail: pa.Table) -> None:
+        if result.num_rows:
+            _write(file=self._part(index=self._parts), table=result)
+            self._parts += 1
+        _write(
+            file=self._directory.joinpath(_TAIL),
+            table=tail.replace_schema_metadata(
+                {_QUERY_KEY: self._query.encode(), _PARTS_KEY: json.dumps(self._parts).encode()}
+            ),
+        )
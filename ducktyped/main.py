@@ -1,14 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Self
+from typing import TYPE_CHECKING, Any, Self
 
-import duckdb
-import polars as pl
+from ducktyped.cache import FileStamp, file_stamps
+from ducktyped.cols import Col, WindowExpr
+from ducktyped.enums import (
+    Context,
+    CsvCompression,
+    JoinTypes,
+    KeyWord,
+    Operators,
+    ParquetCompression,
+)
+from ducktyped.expressions import (
+    AggExpr,
+    AliasExpr,
+    AllExpr,
+    BinaryOpExpr,
+    Compiler,
+    IN_RELATION_COLUMN,
+    Expr,
+    InRelationExpr,
+    literal_sql,
+    walk,
+)
+from ducktyped.incremental import IncrementalState
+from ducktyped.lazy import LazyModule
+from ducktyped.optimizer import optimize, optimize_where, unwrap_casts
+from ducktyped.parsing import SQLParser, TableProtocol, inline_params
+from ducktyped.profiling import (
+    OperatorProfile,
+    Profile,
+    Usage,
+    emit,
+    hottest,
+    parse_profile,
+    parse_usage,
+)
+from ducktyped.session import Resources, Session, database_alias, default_session
+from ducktyped.sources import (
+    hive_bounds,
+    is_single_file,
+    list_files,
+    prune,
+    scan_sql,
+    source_name,
+)
+from ducktyped.statistics import StatisticsIndex, file_bounds
+from ducktyped.validation import validate
 
-from ducktyped.cols import Col
-from ducktyped.enums import JoinTypes
-from ducktyped.expressions import AllExpr, Expr
-from ducktyped.parsing import SQLParser, TableProtocol
+if TYPE_CHECKING:
+    import duckdb
+    import numpy as np
+    import polars as pl
+    import pyarrow as pa
+else:
+    duckdb = LazyModule(name="duckdb")
+    pl = LazyModule(name="polars")
+    pa = LazyModule(name="pyarrow")
 
 
 class ColSelector:
@@ -25,33 +80,276 @@ def all() -> AllExpr:
 
 col = ColSelector()
 
+_BATCH_SOURCE: str = "__source"
+_BATCH_ID: str = "__batch"
+_BATCH_ROW: str = "__row"
+_BATCH_RESULT: str = "__result_"
+_MANIFEST: str = "__ducktyped_files"
+_WATERMARK: str = "__watermark"
+_INCREMENTAL_INPUT: str = "__incremental_input"
+_PARTITION: str = "__partition"
+_LAST: str = "__last"
+_preview_rows: int = 0
+_ASOF_OPERATORS: tuple[Operators, ...] = (
+    Operators.GT,
+    Operators.GTE,
+    Operators.LT,
+    Operators.LTE,
+)
+
+
+@dataclass(slots=True)
+class MemoryTable:
+    frame: pa.Table
+    name: str
+    database: Path | None = field(init=False)
+    _schema: dict[str, str] | None = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.database: Path | None = None
+        self._schema: dict[str, str] | None = None
+
+    @property
+    def schema(self) -> dict[str, str]:
+        if self._schema is None:
+            relation: duckdb.DuckDBPyRelation = default_session.cursor().from_arrow(
+                self.frame.schema.empty_table()
+            )
+            self._schema = {
+                name: str(dtype) for name, dtype in zip(relation.columns, relation.types)
+            }
+        return self._schema
+
+    def files(self) -> list[Path]:
+        return []
 
-def _selection(*cols: Col | Expr) -> list[Expr]:
-    _selected: list[Expr] = []
-    for c in cols:
-        _selected.append(c)
-    return _selected
+    def scan(self, where: Sequence[Expr]) -> str:
+        return self.name
+
+    def aggregate(self, func: str, column: str) -> Any:
+        return None
+
+    def col(self, name: str) -> Col:
+        return Col(_name=name, table=self.name)
 
 
 @dataclass(slots=True)
 class TABLE:
-    path: Path
+    path: Path | list[Path]
     name: str = field(init=False)
+    sidecar: Path | None = None
+    _statistics: StatisticsIndex = field(init=False)
+    _schema: tuple[FileStamp, dict[str, str]] | None = field(init=False)
+    database: Path | None = field(init=False)
+    _sort_by: list[Col] = field(init=False)
+    _appended: list[Path] = field(init=False)
 
     def __post_init__(self) -> None:
-        self.name: str = self.path.stem
+        self.name: str = source_name(path=self.path)
+        self._statistics: StatisticsIndex = StatisticsIndex(sidecar=self.sidecar)
+        self._schema: tuple[FileStamp, dict[str, str]] | None = None
+        self.database: Path | None = None
+        self._sort_by: list[Col] = []
+        self._appended: list[Path] = []
+
+    @property
+    def schema(self) -> dict[str, str]:
+        files: list[Path] = self.files()
+        if not files:
+            return {}
+        stamp: FileStamp = file_stamps(paths=files[:1])[0]
+        if self._schema is None or self._schema[0] != stamp:
+            relation: duckdb.DuckDBPyRelation = default_session.cursor().sql(
+                query=f"DESCRIBE {Context.SELECT} * {Context.FROM} {scan_sql(files=files[:1])}"
+            )
+            self._schema = (
+                stamp,
+                {name: dtype for name, dtype, *_ in relation.fetchall()},
+            )
+        return self._schema[1]
+
+    def files(self) -> list[Path]:
+        listed: list[Path] = list_files(path=self.path)
+        if not self._appended:
+            return listed
+        seen: set[Path] = set(listed)
+        return [*listed, *(file for file in self._appended if file not in seen)]
+
+    def scan(self, where: Sequence[Expr]) -> str:
+        if self.database is not None:
+            return f'{database_alias(database=self.database)}."{self.name}"'
+        if is_single_file(path=self.path) and not self._appended:
+            return f"'{self.path}'"
+        files: list[Path] = self.files()
+        files = prune(
+            files=files,
+            table=self.name,
+            where=where,
+            bounds=[hive_bounds(file=file) for file in files],
+        )
+        if where and len(files) > 1 and files[0].suffix == ".parquet":
+            files = prune(
+                files=files,
+                table=self.name,
+                where=where,
+                bounds=[
+                    file_bounds(stats=stats)
+                    for stats in self._statistics.get(files=files)
+                ],
+            )
+        return scan_sql(files=files)
+
+    def aggregate(self, func: str, column: str) -> Any:
+        files: list[Path] = self.files()
+        if self.database is not None or not files or files[0].suffix != ".parquet":
+            return None
+        return self._statistics.aggregate(files=files, func=func, column=column)
 
     def col(self, name: str) -> Col:
         return Col(_name=name, table=self.name)
 
+    @staticmethod
+    def from_arrow(table: pa.Table, name: str) -> MemoryTable:
+        return MemoryTable(frame=table, name=name)
+
+    @staticmethod
+    def from_polars(df: pl.DataFrame, name: str) -> MemoryTable:
+        return MemoryTable(frame=df.to_arrow(), name=name)
+
+    def materialize(
+        self, database: Path, sort_by: list[Col], session: Session = default_session
+    ) -> Self:
+        alias: str = session.attach(database=database)
+        cursor: duckdb.DuckDBPyConnection = session.cursor()
+        cursor.execute(
+            query=f"CREATE TABLE IF NOT EXISTS {alias}.{_MANIFEST} "
+            "(table_name VARCHAR, path VARCHAR, mtime_ns BIGINT, size BIGINT, appended BOOLEAN)"
+        )
+        cursor.execute(
+            query=f"ALTER TABLE {alias}.{_MANIFEST} "
+            "ADD COLUMN IF NOT EXISTS appended BOOLEAN DEFAULT false"
+        )
+        self._sort_by = sort_by
+        listed: set[Path] = set(self.files())
+        self._appended.extend(
+            file
+            for file in self._appended_files(session=session, alias=alias)
+            if file not in listed and file.exists()
+        )
+        if self._stale(session=session, alias=alias):
+            files: list[Path] = self.files()
+            cursor.begin()
+            try:
+                cursor.execute(
+                    query=f'CREATE OR REPLACE TABLE {alias}."{self.name}" {KeyWord.AS} '
+                    f"{self._sorted_scan(files=files)}"
+                )
+                cursor.execute(
+                    query=f"DELETE {Context.FROM} {alias}.{_MANIFEST} {Context.WHERE} table_name = ?",
+                    parameters=[self.name],
+                )
+                self._record(
+                    session=session, alias=alias, files=files, appended=set(self._appended)
+                )
+                cursor.commit()
+            except Exception:
+                cursor.rollback()
+                raise
+            cursor.execute(query=f"CHECKPOINT {alias}")
+        self.database = database
+        return self
+
+    def append(
+        self, new_files: list[Path], session: Session = default_session
+    ) -> list[Path]:
+        if self.database is None:
+            raise ValueError(f"Table {self.name} is not materialized")
+        alias: str = session.attach(database=self.database)
+        recorded: dict[str, FileStamp] = self._manifest(session=session, alias=alias)
+        unseen: list[Path] = [file for file in new_files if str(file) not in recorded]
+        if not unseen:
+            return []
+        cursor: duckdb.DuckDBPyConnection = session.cursor()
+        cursor.begin()
+        try:
+            cursor.execute(
+                query=f'INSERT INTO {alias}."{self.name}" BY NAME '
+                f"{self._sorted_scan(files=unseen)}"
+            )
+            self._record(session=session, alias=alias, files=unseen, appended=set(unseen))
+            cursor.commit()
+        except Exception:
+            cursor.rollback()
+            raise
+        cursor.execute(query=f"CHECKPOINT {alias}")
+        self._appended.extend(unseen)
+        return unseen
+
+    def stale(self, session: Session = default_session) -> list[Path]:
+        if self.database is None:
+            return []
+        return self._stale(session=session, alias=session.attach(database=self.database))
+
+    def _stale(self, session: Session, alias: str) -> list[Path]:
+        recorded: dict[str, FileStamp] = self._manifest(session=session, alias=alias)
+        current: dict[str, FileStamp] = {
+            stamp.path: stamp for stamp in file_stamps(paths=self.files())
+        }
+        return sorted(
+            Path(path)
+            for path in recorded.keys() | current.keys()
+            if recorded.get(path) != current.get(path)
+        )
+
+    def _sorted_scan(self, files: list[Path]) -> str:
+        query: str = f"{Context.SELECT} * {Context.FROM} {scan_sql(files=files)}"
+        if not self._sort_by:
+            return query
+        return f"{query} {Context.ORDER_BY} {', '.join(c._name for c in self._sort_by)}"
+
+    def _manifest(self, session: Session, alias: str) -> dict[str, FileStamp]:
+        rows: list[tuple[str, int, int]] = (
+            session.cursor()
+            .execute(
+                query=f"{Context.SELECT} path, mtime_ns, size {Context.FROM} {alias}.{_MANIFEST} "
+                f"{Context.WHERE} table_name = ?",
+                parameters=[self.name],
+            )
+            .fetchall()
+        )
+        return {row[0]: FileStamp(*row) for row in rows}
+
+    def _appended_files(self, session: Session, alias: str) -> list[Path]:
+        rows: list[tuple[str]] = (
+            session.cursor()
+            .execute(
+                query=f"{Context.SELECT} path {Context.FROM} {alias}.{_MANIFEST} "
+                f"{Context.WHERE} table_name = ? {KeyWord.AND} appended",
+                parameters=[self.name],
+            )
+            .fetchall()
+        )
+        return [Path(row[0]) for row in rows]
+
+    def _record(
+        self, session: Session, alias: str, files: list[Path], appended: set[Path]
+    ) -> None:
+        session.cursor().executemany(
+            query=f"INSERT INTO {alias}.{_MANIFEST} VALUES (?, ?, ?, ?, ?)",
+            parameters=[
+                [self.name, *stamp, file in appended]
+                for file, stamp in zip(files, file_stamps(paths=files))
+            ],
+        )
+
 
 class SelectBuilder:
     __slots__ = ("_selected",)
 
     def __init__(self, *cols: Col | Expr) -> None:
-        self._selected: list[Expr] = _selection(*cols)
+        self._selected: tuple[Expr, ...] = optimize(roots=cols)
 
-    def FROM(self, table: TABLE) -> "Query":
+    def FROM(self, table: TableProtocol) -> "Query":
         return Query(table=table, selected=self._selected)
 
 
@@ -67,17 +365,29 @@ class Query:
         "_group_by",
         "_order_by",
         "_joins",
-        "_table_aliases",
+        "_parent",
+        "_branches",
+        "_parser",
+        "_validated",
+        "_structure",
+        "_relation_tables",
+        "_limit",
     )
 
-    def __init__(self, table: TableProtocol, selected: list[Expr]) -> None:
+    def __init__(self, table: TableProtocol, selected: tuple[Expr, ...]) -> None:
         self._table: TableProtocol = table
-        self._selected: list[Expr] = selected
-        self._where_clause: list[Expr] = []
-        self._group_by: list[Expr] = []
-        self._order_by: list[tuple[Expr, bool]] = []
-        self._joins: list[tuple[TableProtocol, Expr, JoinTypes]] = []
-        self._table_aliases: dict[str, str] = {table.name: table.name}
+        self._selected: tuple[Expr, ...] = selected
+        self._where_clause: tuple[Expr, ...] = ()
+        self._group_by: tuple[Expr, ...] = ()
+        self._order_by: tuple[tuple[Expr, bool], ...] = ()
+        self._joins: tuple[tuple[TableProtocol, Expr, JoinTypes], ...] = ()
+        self._parent: Query | None = None
+        self._branches: int = 0
+        self._parser: SQLParser | None = None
+        self._validated: tuple[SQLParser, SQLParser] | None = None
+        self._structure: tuple[Any, ...] | None = None
+        self._relation_tables: dict[str, pa.Table] | None = None
+        self._limit: tuple[int, int] | None = None
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}:\n({self.explain()})"
@@ -85,57 +395,695 @@ class Query:
     def _repr_html_(self) -> str:
         lines: list[str] = self.explain().splitlines()
         html_lines: list[str] = [f"<pre>{line}</pre>" for line in lines]
-        return f"{self.__class__.__name__}:\n({''.join(html_lines)})"
+        sql: str = f"{self.__class__.__name__}:\n({''.join(html_lines)})"
+        if not _preview_rows:
+            return sql
+        try:
+            preview: pl.DataFrame = self.head(_preview_rows).execute_to_pl()
+        except (OSError, ValueError, duckdb.Error):
+            return sql
+        return f"{sql}{preview._repr_html_()}"
 
-    def WHERE(self, *cols: Expr) -> Self:
-        self._where_clause.extend((c) for c in cols)
-        return self
+    def __hash__(self) -> int:
+        return hash(self._key())
 
-    def GROUP_BY(self, *cols: Expr) -> Self:
-        for c in cols:
-            self._group_by.append((c))
-        return self
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Query) and self._key() == other._key()
 
-    def ORDER_BY(self, *cols: Expr, ascending: bool = True) -> Self:
-        for c in cols:
-            self._order_by.append(((c), ascending))
-        return self
+    def _key(self) -> tuple[Any, ...]:
+        if self._structure is None:
+            parser: SQLParser = self._to_parser()
+            self._structure = (
+                id(self._table),
+                tuple((id(table), how) for table, _, how in self._joins),
+                tuple(parser.select),
+                tuple(parser.join_conditions),
+                parser.where,
+                parser.group,
+                parser.window,
+                parser.order,
+                parser.limit,
+                tuple((type(value), value) for value in parser.params),
+            )
+        return self._structure
+
+    def _branch(self) -> "Query":
+        query: Query = Query(table=self._table, selected=self._selected)
+        query._where_clause = self._where_clause
+        query._group_by = self._group_by
+        query._order_by = self._order_by
+        query._joins = self._joins
+        query._limit = self._limit
+        query._parent = self
+        self._branches += 1
+        return query
+
+    def WHERE(self, *cols: Expr) -> "Query":
+        query: Query = self._branch()
+        query._where_clause = optimize_where(existing=self._where_clause, new=cols)
+        return query
 
-    def LEFT_JOIN(self, table: TABLE, on: Expr) -> Self:
+    def GROUP_BY(self, *cols: Expr) -> "Query":
+        query: Query = self._branch()
+        query._group_by = (*self._group_by, *optimize(roots=cols))
+        return query
+
+    def ORDER_BY(self, *cols: Expr, ascending: bool = True) -> "Query":
+        query: Query = self._branch()
+        query._order_by = (
+            *self._order_by,
+            *((c, ascending) for c in optimize(roots=cols)),
+        )
+        return query
+
+    def LIMIT(self, n: int, offset: int = 0) -> "Query":
+        if n < 0 or offset < 0:
+            raise ValueError("LIMIT and OFFSET must not be negative")
+        query: Query = self._branch()
+        if self._limit is None:
+            query._limit = (n, offset)
+        else:
+            query._limit = (
+                min(n, max(self._limit[0] - offset, 0)),
+                self._limit[1] + offset,
+            )
+        return query
+
+    def head(self, n: int) -> "Query":
+        return self.LIMIT(n)
+
+    def LEFT_JOIN(self, table: TableProtocol, on: Expr) -> "Query":
         return self._get_join(table=table, on=on, how="LEFT")
 
-    def RIGHT_JOIN(self, table: TABLE, on: Expr) -> Self:
+    def RIGHT_JOIN(self, table: TableProtocol, on: Expr) -> "Query":
         return self._get_join(table=table, on=on, how="RIGHT")
 
-    def INNER_JOIN(self, table: TABLE, on: Expr) -> Self:
+    def INNER_JOIN(self, table: TableProtocol, on: Expr) -> "Query":
         return self._get_join(table=table, on=on, how="INNER")
 
-    def FULL_JOIN(self, table: TABLE, on: Expr) -> Self:
+    def FULL_JOIN(self, table: TableProtocol, on: Expr) -> "Query":
         return self._get_join(table=table, on=on, how="FULL")
 
+    def ASOF_JOIN(self, table: TableProtocol, on: Expr, by: list[Col]) -> "Query":
+        return self._get_join(
+            table=table, on=self._asof_condition(table=table, on=on, by=by), how="ASOF"
+        )
+
+    def ASOF_LEFT_JOIN(self, table: TableProtocol, on: Expr, by: list[Col]) -> "Query":
+        return self._get_join(
+            table=table, on=self._asof_condition(table=table, on=on, by=by), how="ASOF LEFT"
+        )
+
+    def _asof_condition(self, table: TableProtocol, on: Expr, by: list[Col]) -> Expr:
+        if not isinstance(on, BinaryOpExpr) or on._op not in _ASOF_OPERATORS:
+            raise ValueError("ASOF joins need one >, >=, < or <= comparison in on")
+        condition: Expr = on
+        for key in reversed(by):
+            condition = BinaryOpExpr(
+                table=self._table.name,
+                _left=Col(_name=key._name, table=self._table.name).eq(
+                    Col(_name=key._name, table=table.name)
+                ),
+                _op=Operators.AND,
+                _right=condition,
+            )
+        return condition
+
     def _to_parser(self) -> SQLParser:
-        return SQLParser(
-            selected=self._selected,
-            where_clause=self._where_clause,
-            group_by=self._group_by,
-            order_by=self._order_by,
-            joins=self._joins,
+        if self._parser is None:
+            parent: Query | None = self._parent
+            while parent is not None and parent._parser is None and parent._branches < 2:
+                parent = parent._parent
+            self._parser = SQLParser(
+                selected=self._selected,
+                where_clause=self._where_clause,
+                group_by=self._group_by,
+                order_by=self._order_by,
+                joins=self._joins,
+                limit=self._limit,
+                parent=None if parent is None else parent._to_parser(),
+            )
+        return self._parser
+
+    def _validate(self) -> SQLParser:
+        parser: SQLParser = self._to_parser()
+        if self._validated is not None and self._validated[0] is parser:
+            return self._validated[1]
+        schemas: dict[str, dict[str, str]] = {self._table.name: self._table.schema}
+        for table, _, _ in self._joins:
+            schemas[table.name] = table.schema
+        types: dict[int, str] = validate(
+            exprs=[
+                *self._selected,
+                *self._where_clause,
+                *self._group_by,
+                *(expr for expr, _ in self._order_by),
+                *(on for _, on, _ in self._joins),
+            ],
+            schemas=schemas,
+            aliases={
+                expr._alias.lower()
+                for expr in self._selected
+                if isinstance(expr, AliasExpr)
+            },
+        )
+        where: tuple[Expr, ...] = unwrap_casts(predicates=self._where_clause, types=types)
+        executable: SQLParser = parser
+        if where is not self._where_clause:
+            executable = SQLParser(
+                selected=self._selected,
+                where_clause=where,
+                group_by=self._group_by,
+                order_by=self._order_by,
+                joins=self._joins,
+                limit=self._limit,
+                parent=None,
+            )
+        self._validated = (parser, executable)
+        return executable
+
+    def _compile(self, session: Session) -> tuple[str, list[Any], list[Path]]:
+        parser: SQLParser = self._validate()
+        query: str = parser.get_executable_query(
+            table=self._from(), joins=self._join_sources()
         )
+        sources: list[Path] = self._sources(session=session)
+        answer: str | None = self._metadata_answer(session=session, query=query)
+        return answer or query, parser.params, sources
 
-    def execute_to_pl(self) -> pl.DataFrame:
-        conn: duckdb.DuckDBPyConnection = duckdb.connect(database=self._table.path)  # type: ignore[call-arg]
-        try:
-            query: str = self._to_parser().get_executable_query(
-                table=str(object=self._table.path)
+    def _execute(
+        self, session: Session
+    ) -> duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation:
+        query, params, sources = self._compile(session=session)
+        return session.execute(
+            query=query, params=params, sources=sources, relations=self._relations()
+        )
+
+    def _execute_profiled(
+        self, query: str, params: list[Any], resources: Resources | None, session: Session
+    ) -> tuple[pa.Table, str]:
+        with tempfile.TemporaryDirectory() as directory:
+            output: Path = Path(directory).joinpath("profile.json")
+            table: pa.Table = session.execute_isolated(
+                query=query,
+                params=params,
+                tables=self._relations(),
+                settings={"enable_profiling": "json", "profiling_output": str(output)},
+                resources=resources,
+            )
+            return table, output.read_text()
+
+    def _relations(self) -> dict[str, pa.Table]:
+        if self._relation_tables is None:
+            roots: list[Expr] = [
+                *self._selected,
+                *self._where_clause,
+                *self._group_by,
+                *(expr for expr, _ in self._order_by),
+                *(on for _, on, _ in self._joins),
+            ]
+            relations: dict[str, pa.Table] = {}
+            self._add_frames(relations=relations)
+            self._relation_tables = relations | {
+                expr._relation: pa.table(
+                    {
+                        IN_RELATION_COLUMN: expr._values.to_arrow()
+                        if isinstance(expr._values, pl.Series)
+                        else expr._values
+                    }
+                )
+                for expr in walk(roots=roots)
+                if isinstance(expr, InRelationExpr)
+            }
+        return self._relation_tables
+
+    def _add_frames(self, relations: dict[str, pa.Table]) -> None:
+        for table in (self._table, *(table for table, _, _ in self._joins)):
+            if not isinstance(table, MemoryTable):
+                continue
+            if relations.setdefault(table.name, table.frame) is not table.frame:
+                raise ValueError(f"Two different in-memory tables are named {table.name}")
+
+    def _sources(self, session: Session) -> list[Path]:
+        sources: list[Path] = []
+        for table in (self._table, *(table for table, _, _ in self._joins)):
+            if table.database is None:
+                sources.extend(table.files())
+            else:
+                session.attach(database=table.database)
+                sources.append(table.database)
+        return sources
+
+    def _metadata_answer(self, session: Session, query: str) -> str | None:
+        if (
+            self._where_clause
+            or self._group_by
+            or self._order_by
+            or self._joins
+            or self._limit is not None
+        ):
+            return None
+        values: list[Any] = []
+        for expr in self._selected:
+            agg: Expr = expr._expr if isinstance(expr, AliasExpr) else expr
+            if (
+                not isinstance(agg, AggExpr)
+                or not isinstance(agg._expr, Col)
+                or agg._expr.table not in (None, self._table.name)
+            ):
+                return None
+            value: Any = self._table.aggregate(func=agg._func, column=agg._expr._name)
+            if value is None:
+                return None
+            values.append(value)
+        relation: duckdb.DuckDBPyRelation = session.cursor().sql(query=query)
+        columns: list[str] = []
+        for name, dtype, value in zip(relation.columns, relation.types, values):
+            quoted: str = name.replace('"', '""')
+            columns.append(
+                f'{KeyWord.CAST}({literal_sql(value)} {KeyWord.AS} {dtype}) {KeyWord.AS} "{quoted}"'
+            )
+        return f"{Context.SELECT} {', '.join(columns)}"
+
+    def execute_to_pl(self, session: Session = default_session) -> pl.DataFrame:
+        return self._execute(session=session).pl()
+
+    async def execute_async(self, session: Session = default_session) -> pl.DataFrame:
+        return await session.run_async(func=lambda: self.execute_to_pl(session=session))
+
+    def execute_to_arrow(self, session: Session = default_session) -> pa.Table:
+        return self._execute(session=session).arrow()
+
+    def execute_to_numpy(
+        self, session: Session = default_session
+    ) -> dict[str, np.ndarray]:
+        return self._execute(session=session).fetchnumpy()
+
+    def execute_scalar(self, session: Session = default_session) -> Any:
+        row: tuple[Any, ...] | None = self._execute(session=session).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def execute_with_resources(
+        self, resources: Resources, session: Session = default_session
+    ) -> tuple[pl.DataFrame, Usage]:
+        query, params, _ = self._compile(session=session)
+        table, raw = self._execute_profiled(
+            query=query, params=params, resources=resources, session=session
+        )
+        return pl.DataFrame(data=table), parse_usage(raw=raw)
+
+    def iter_batches(
+        self, batch_size: int, session: Session = default_session
+    ) -> Iterator[pl.DataFrame]:
+        parser: SQLParser = self._validate()
+        self._sources(session=session)
+        query: str = parser.get_executable_query(
+            table=self._from(), joins=self._join_sources()
+        )
+        for batch in session.iter_batches(
+            query=query,
+            params=parser.params,
+            batch_size=batch_size,
+            relations=self._relations(),
+        ):
+            yield pl.DataFrame(data=batch)
+
+    def profile(self, session: Session = default_session) -> Profile:
+        stages: dict[str, float] = {}
+        start: float = time.perf_counter()
+        self._validate()
+        stages["validate"] = time.perf_counter() - start
+        start = time.perf_counter()
+        query, params, _ = self._compile(session=session)
+        stages["compile"] = time.perf_counter() - start
+        start = time.perf_counter()
+        table, raw = self._execute_profiled(
+            query=query, params=params, resources=None, session=session
+        )
+        stages["execute"] = time.perf_counter() - start
+        start = time.perf_counter()
+        frame: pl.DataFrame = pl.DataFrame(data=table)
+        stages["convert"] = time.perf_counter() - start
+        operators: OperatorProfile = parse_profile(raw=raw)
+        profile: Profile = Profile(
+            query=inline_params(query, params),
+            stages=stages,
+            rows=frame.height,
+            bytes=frame.estimated_size(),
+            usage=parse_usage(raw=raw),
+            operators=operators,
+            hottest=hottest(root=operators),
+        )
+        emit(profile=profile)
+        return profile
+
+    def execute_incremental(
+        self, state: Path, session: Session = default_session
+    ) -> pl.DataFrame:
+        windows: list[WindowExpr] = [
+            expr for expr in walk(roots=self._selected) if isinstance(expr, WindowExpr)
+        ]
+        if (
+            not windows
+            or self._joins
+            or self._group_by
+            or self._order_by
+            or self._limit is not None
+            or any(isinstance(expr, AggExpr) for expr in walk(roots=self._selected))
+        ):
+            raise ValueError(
+                "Incremental execution needs rolling windows without joins, aggregates, GROUP BY, ORDER BY or LIMIT"
+            )
+        order: Col | None = windows[0].order_by
+        if order is None or any(window.spec() != windows[0].spec() for window in windows):
+            raise ValueError(
+                "Incremental execution needs all rolling windows to share one PARTITION BY and ORDER BY"
+            )
+        partitions: list[str] = [c._name for c in windows[0].partition_by]
+        keys: list[str] = [f"{_PARTITION}{i}" for i in range(len(partitions))]
+        parser: SQLParser = SQLParser(
+            selected=(
+                *self._selected,
+                AliasExpr(table=None, _expr=order, _alias=_WATERMARK),
+                *(
+                    AliasExpr(table=None, _expr=c, _alias=key)
+                    for c, key in zip(windows[0].partition_by, keys)
+                ),
+            ),
+            where_clause=self._where_clause,
+            group_by=(),
+            order_by=(),
+            joins=(),
+            limit=None,
+            parent=None,
+        )
+        store: IncrementalState = IncrementalState(
+            directory=state,
+            query=inline_params(
+                parser.get_executable_query(table=self._table.name, joins=[]), parser.params
+            ),
+        )
+        tail: pa.Table | None = store.tail()
+        source: Query = Query(
+            table=self._table,
+            selected=tuple(
+                Col(_name=name) for name in sorted(self._source_columns() or ())
+            ),
+        ).WHERE(*self._where_clause)
+        watermarks: pl.DataFrame | None = None
+        frames: list[pl.DataFrame] = []
+        if tail is not None and tail.num_rows:
+            stored: pl.DataFrame = pl.DataFrame(data=tail)
+            watermarks = (
+                stored.group_by(partitions).agg(pl.col(order._name).max().alias(_LAST))
+                if partitions
+                else stored.select(pl.col(order._name).max().alias(_LAST))
+            )
+            source = source.WHERE(order.gt(watermarks.get_column(_LAST).min()))
+            frames.append(stored)
+        scanned: pl.DataFrame = source.execute_to_pl(session=session)
+        if watermarks is not None:
+            scanned = _newer(
+                frame=scanned, watermarks=watermarks, on=partitions, order=order._name
+            )
+        frames.append(scanned)
+        combined: pl.DataFrame = pl.concat(frames).sort(order._name, maintain_order=True)
+        result: pl.DataFrame = pl.DataFrame(
+            data=session.execute_isolated(
+                query=parser.get_executable_query(
+                    table=f'{_INCREMENTAL_INPUT} {KeyWord.AS} "{self._table.name}"',
+                    joins=[],
+                ),
+                params=parser.params,
+                tables={_INCREMENTAL_INPUT: combined, **self._relations()},
+                settings={},
+                resources=None,
+            )
+        )
+        if watermarks is not None:
+            result = _newer(
+                frame=result,
+                watermarks=watermarks.rename(dict(zip(partitions, keys))),
+                on=keys,
+                order=_WATERMARK,
             )
-            return conn.execute(query=query).pl()
-        finally:
-            conn.close()
+        result = result.drop(_WATERMARK, *keys)
+        size: int = max(window.window_size for window in windows)
+        store.append(
+            result=result.to_arrow(),
+            tail=(
+                combined.group_by(partitions, maintain_order=True)
+                .tail(size)
+                .select(combined.columns)
+                if partitions
+                else combined.tail(size)
+            ).to_arrow(),
+        )
+        parts: list[pa.Table] = store.output()
+        if not parts:
+            return result
+        return pl.concat([pl.DataFrame(data=part) for part in parts])
+
+    def sink_parquet(
+        self,
+        path: Path,
+        partition_by: list[Col],
+        compression: ParquetCompression,
+        row_group_size: int | None,
+        file_size_bytes: int | None,
+        overwrite: bool,
+        resources: Resources | None,
+        session: Session = default_session,
+    ) -> int:
+        options: list[str] = ["FORMAT parquet", f"COMPRESSION {literal_sql(compression)}"]
+        if row_group_size is not None:
+            options.append(f"ROW_GROUP_SIZE {row_group_size}")
+        return self._sink(
+            path=path,
+            partition_by=partition_by,
+            file_size_bytes=file_size_bytes,
+            overwrite=overwrite,
+            options=options,
+            resources=resources,
+            session=session,
+        )
+
+    def sink_csv(
+        self,
+        path: Path,
+        partition_by: list[Col],
+        compression: CsvCompression,
+        file_size_bytes: int | None,
+        overwrite: bool,
+        resources: Resources | None,
+        session: Session = default_session,
+    ) -> int:
+        return self._sink(
+            path=path,
+            partition_by=partition_by,
+            file_size_bytes=file_size_bytes,
+            overwrite=overwrite,
+            options=["FORMAT csv", f"COMPRESSION {literal_sql(compression)}"],
+            resources=resources,
+            session=session,
+        )
+
+    def _sink(
+        self,
+        path: Path,
+        partition_by: list[Col],
+        file_size_bytes: int | None,
+        overwrite: bool,
+        options: list[str],
+        resources: Resources | None,
+        session: Session,
+    ) -> int:
+        if partition_by and file_size_bytes is not None:
+            raise ValueError("DuckDB cannot split partitioned output by file size")
+        if partition_by:
+            options.append(f"PARTITION_BY ({', '.join(c._name for c in partition_by)})")
+        if file_size_bytes is not None:
+            options.append(f"FILE_SIZE_BYTES {file_size_bytes}")
+        if overwrite:
+            options.append("OVERWRITE")
+        parser: SQLParser = self._validate()
+        self._sources(session=session)
+        query: str = parser.get_executable_query(
+            table=self._from(), joins=self._join_sources()
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written: pa.Table = session.execute_isolated(
+            query=f"COPY ({query}) TO {literal_sql(str(path))} ({', '.join(options)})",
+            params=parser.params,
+            tables=self._relations(),
+            settings={},
+            resources=resources,
+        )
+        return written.column(0)[0].as_py()
 
     def explain(self) -> str:
-        return self._to_parser().get_explained_query(table=str(object=self._table.path))
+        return self._to_parser().get_explained_query(
+            table=self._from(), joins=self._join_sources()
+        )
 
-    def _get_join(self, table: TABLE, on: Expr, how: JoinTypes) -> Self:
-        self._table_aliases[table.name] = table.name
-        self._joins.append((table, on, how))
-        return self
+    def _from(self) -> str:
+        return f'{self._table.scan(where=self._where_clause)} {KeyWord.AS} "{self._table.name}"'
+
+    def _join_sources(self) -> list[str]:
+        return [
+            f'{table.scan(where=self._where_clause)} {KeyWord.AS} "{table.name}"'
+            for table, _, _ in self._joins
+        ]
+
+    def _source_columns(self) -> set[str] | None:
+        if self._joins:
+            return None
+        aliases: set[str] = {
+            expr._alias for expr in self._selected if isinstance(expr, AliasExpr)
+        }
+        names: set[str] = set()
+        for expr in walk(roots=[*self._selected, *self._where_clause]):
+            if isinstance(expr, AllExpr):
+                schema: dict[str, str] = self._table.schema
+                if not schema:
+                    return None
+                names.update(schema)
+            if isinstance(expr, Col):
+                names.add(expr._name)
+        for expr in walk(roots=[*self._group_by, *(e for e, _ in self._order_by)]):
+            if isinstance(expr, AllExpr):
+                return None
+            if isinstance(expr, Col) and expr._name not in aliases:
+                names.add(expr._name)
+        return names
+
+    def _get_join(self, table: TableProtocol, on: Expr, how: JoinTypes) -> "Query":
+        query: Query = self._branch()
+        condition: Expr = optimize(roots=(on,))[0]
+        query._joins = (*self._joins, (table, condition, how))
+        return query
+
+
+def set_preview_rows(rows: int) -> None:
+    global _preview_rows
+    if rows < 0:
+        raise ValueError("Preview rows must not be negative")
+    _preview_rows = rows
+
+
+def _newer(
+    frame: pl.DataFrame, watermarks: pl.DataFrame, on: list[str], order: str
+) -> pl.DataFrame:
+    if not on:
+        return frame.filter(pl.col(order) > watermarks.get_column(_LAST).item())
+    return (
+        frame.join(watermarks, on=on, how="left", nulls_equal=True, maintain_order="left")
+        .filter(pl.col(_LAST).is_null() | (pl.col(order) > pl.col(_LAST)))
+        .drop(_LAST)
+    )
+
+
+async def gather(
+    *queries: Query, max_concurrency: int, session: Session = default_session
+) -> list[pl.DataFrame]:
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(value=max_concurrency)
+
+    async def _bounded(query: Query) -> pl.DataFrame:
+        async with semaphore:
+            return await query.execute_async(session=session)
+
+    return await asyncio.gather(*(_bounded(query) for query in queries))
+
+
+def _execute_shared(queries: list[Query], session: Session) -> list[pl.DataFrame]:
+    table: TableProtocol = queries[0]._table
+    columns: set[str] = set()
+    projection: str = "*"
+    for query in queries:
+        query_columns: set[str] | None = query._source_columns()
+        if query_columns is None:
+            break
+        columns.update(name.lower() for name in query_columns)
+    else:
+        projection = ", ".join(
+            '"' + name.replace('"', '""') + '"'
+            for name in table.schema
+            if name.lower() in columns
+        )
+    params: list[Any] = []
+    source_sql: str = (
+        f'{Context.SELECT} {projection} {Context.FROM} {table.scan(where=[])} {KeyWord.AS} "{table.name}"'
+    )
+    schema: set[str] = {name.lower() for name in table.schema}
+    if not any(query._joins or not query._where_clause for query in queries) and not any(
+        isinstance(expr, Col)
+        and (expr.table not in (None, table.name) or expr._name.lower() not in schema)
+        for query in queries
+        for expr in walk(roots=query._where_clause)
+    ):
+        compiler: Compiler = Compiler(
+            roots=[cond for query in queries for cond in query._where_clause],
+            windows={},
+        )
+        branches: list[str] = []
+        for query in queries:
+            conditions: list[str] = [
+                compiler.compile(root=cond, params=params)
+                for cond in query._where_clause
+            ]
+            branches.append(f"({f' {KeyWord.AND} '.join(conditions)})")
+        source_sql += f" {Context.WHERE} {f' {KeyWord.OR} '.join(branches)}"
+    selects: list[str] = []
+    sources: list[Path] = []
+    for i, query in enumerate(queries):
+        parser: SQLParser = query._validate()
+        query_sql: str = parser.get_executable_query(
+            table=f'{_BATCH_SOURCE} {KeyWord.AS} "{table.name}"',
+            joins=query._join_sources(),
+        )
+        params.extend(parser.params)
+        sources.extend(query._sources(session=session))
+        selects.append(
+            f"{Context.SELECT} {i} {KeyWord.AS} {_BATCH_ID}, {_BATCH_ROW} {KeyWord.AS} {_BATCH_RESULT}{i} "
+            f"{Context.FROM} ({query_sql}) {KeyWord.AS} {_BATCH_ROW}"
+        )
+    shared_sql: str = (
+        f"{Context.WITH} {_BATCH_SOURCE} {KeyWord.AS} {KeyWord.MATERIALIZED} ({source_sql}) "
+        + f" {Context.UNION_ALL_BY_NAME} ".join(selects)
+    )
+    relations: dict[str, pa.Table] = {}
+    frames: dict[str, pa.Table] = {}
+    for query in queries:
+        query._add_frames(relations=frames)
+        relations.update(query._relations())
+    frame: pl.DataFrame = session.execute(
+        query=shared_sql,
+        params=params,
+        sources=list(dict.fromkeys(sources)),
+        relations=relations,
+    ).pl()
+    return [
+        frame.filter(pl.col(_BATCH_ID).eq(i))
+        .select(f"{_BATCH_RESULT}{i}")
+        .unnest(f"{_BATCH_RESULT}{i}")
+        for i in range(len(queries))
+    ]
+
+
+def batch(queries: list[Query], session: Session = default_session) -> list[pl.DataFrame]:
+    groups: dict[tuple[str, int], list[int]] = {}
+    for i, query in enumerate(queries):
+        frame: int = id(query._table.frame) if isinstance(query._table, MemoryTable) else 0
+        groups.setdefault((query._table.scan(where=[]), frame), []).append(i)
+    results: dict[int, pl.DataFrame] = {}
+    for indices in groups.values():
+        if len(indices) == 1:
+            results[indices[0]] = queries[indices[0]].execute_to_pl(session=session)
+            continue
+        frames: list[pl.DataFrame] = _execute_shared(
+            queries=[queries[i] for i in indices], session=session
+        )
+        results.update(zip(indices, frames))
+    return [results[i] for i in range(len(queries))]
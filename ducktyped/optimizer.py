@@ -0,0 +1,172 @@
+from collections.abc import Iterable
+from dataclasses import replace
+from typing import Any
+
+from ducktyped.cols import Col
+from ducktyped.enums import Operators, Types
+from ducktyped.expressions import (
+    AggExpr,
+    AliasExpr,
+    BinaryOpExpr,
+    CastExpr,
+    ClipExpr,
+    Expr,
+    InExpr,
+    InRelationExpr,
+    LiteralExpr,
+    UnaryFuncExpr,
+)
+
+_INTEGER_RANGES: dict[str, tuple[int, int]] = {
+    Types.TINYINT: (-(2**7), 2**7 - 1),
+    Types.SMALLINT: (-(2**15), 2**15 - 1),
+    Types.INTEGER: (-(2**31), 2**31 - 1),
+    Types.BIGINT: (-(2**63), 2**63 - 1),
+    Types.UTINYINT: (0, 2**8 - 1),
+    Types.USMALLINT: (0, 2**16 - 1),
+    Types.UINTEGER: (0, 2**32 - 1),
+    Types.UBIGINT: (0, 2**64 - 1),
+}
+_MANTISSA_BITS: dict[str, int] = {Types.FLOAT: 24, Types.DOUBLE: 53}
+_COMPARISONS: tuple[Operators, ...] = (
+    Operators.GT,
+    Operators.GTE,
+    Operators.LT,
+    Operators.LTE,
+    Operators.EQ,
+    Operators.NEQ,
+)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def _children(node: Expr) -> tuple[Expr, ...]:
+    if isinstance(node, BinaryOpExpr):
+        return (node._left, node._right)
+    if isinstance(
+        node,
+        AliasExpr | CastExpr | UnaryFuncExpr | ClipExpr | AggExpr | InExpr | InRelationExpr,
+    ):
+        return (node._expr,)
+    return ()
+
+
+def _rewrite_clip(node: ClipExpr) -> Expr:
+    inner: Expr = node._expr
+    if not isinstance(inner, ClipExpr):
+        return node
+    bounds: tuple[float | int, ...] = (
+        inner._min_val,
+        inner._max_val,
+        node._min_val,
+        node._max_val,
+    )
+    if not all(_is_number(value=bound) and bound == bound for bound in bounds):
+        return node
+    low: float | int = min(max(inner._min_val, node._min_val), node._max_val)
+    high: float | int = min(max(inner._max_val, node._min_val), node._max_val)
+    if any(isinstance(bound, float) for bound in bounds):
+        low, high = float(low), float(high)
+    return ClipExpr(table=node.table, _expr=inner._expr, _min_val=low, _max_val=high)
+
+
+def _rewrite(node: Expr) -> Expr:
+    if isinstance(node, ClipExpr):
+        return _rewrite_clip(node=node)
+    if (
+        isinstance(node, CastExpr)
+        and isinstance(node._expr, CastExpr)
+        and node._expr._dtype.to_sql() == node._dtype.to_sql()
+    ):
+        return node._expr
+    return node
+
+
+def optimize(roots: Iterable[Expr]) -> tuple[Expr, ...]:
+    pending: list[Expr] = list(roots)
+    optimized: dict[int, Expr] = {}
+    stack: list[tuple[Expr, bool]] = [(root, False) for root in reversed(pending)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in optimized:
+            continue
+        children: tuple[Expr, ...] = _children(node=node)
+        if not expanded and children:
+            stack.append((node, True))
+            stack.extend((child, False) for child in children)
+            continue
+        if isinstance(node, BinaryOpExpr):
+            left: Expr = optimized[id(node._left)]
+            right: Expr = optimized[id(node._right)]
+            if left is not node._left or right is not node._right:
+                node_out: Expr = replace(node, _left=left, _right=right)
+            else:
+                node_out = node
+        elif children and optimized[id(children[0])] is not children[0]:
+            node_out = replace(node, _expr=optimized[id(children[0])])
+        else:
+            node_out = node
+        optimized[id(node)] = _rewrite(node=node_out)
+    return tuple(optimized[id(root)] for root in pending)
+
+
+def _predicate_key(expr: Expr) -> tuple[Any, ...]:
+    params: list[Any] = []
+    sql: str = expr.to_sql(params=params)
+    return (sql, *((type(value), value) for value in params))
+
+
+def optimize_where(existing: tuple[Expr, ...], new: Iterable[Expr]) -> tuple[Expr, ...]:
+    seen: set[tuple[Any, ...]] = {_predicate_key(expr=expr) for expr in existing}
+    kept: list[Expr] = []
+    for expr in optimize(roots=new):
+        key: tuple[Any, ...] = _predicate_key(expr=expr)
+        if key not in seen:
+            seen.add(key)
+            kept.append(expr)
+    return (*existing, *kept)
+
+
+def _exact_cast(source: str, target: str) -> bool:
+    bounds: tuple[int, int] | None = _INTEGER_RANGES.get(source)
+    if bounds is None:
+        return False
+    low, high = bounds
+    if target in _INTEGER_RANGES:
+        target_low, target_high = _INTEGER_RANGES[target]
+        return target_low <= low and high <= target_high
+    bits: int | None = _MANTISSA_BITS.get(target)
+    return bits is not None and max(-low, high) <= 2**bits
+
+
+def _unwrap_cast(predicate: Expr, types: dict[int, str]) -> Expr:
+    if not isinstance(predicate, BinaryOpExpr) or predicate._op not in _COMPARISONS:
+        return predicate
+    cast: Expr = predicate._left
+    literal: Expr = predicate._right
+    if (
+        not isinstance(cast, CastExpr)
+        or not isinstance(cast._expr, Col)
+        or not isinstance(literal, LiteralExpr)
+        or not _is_number(value=literal._value)
+        or not isinstance(literal._value, int)
+    ):
+        return predicate
+    source: str | None = types.get(id(cast._expr))
+    target: str = cast._dtype.to_sql()
+    if source is None or not _exact_cast(source=source, target=target):
+        return predicate
+    if target in _MANTISSA_BITS and float(literal._value) != literal._value:
+        return predicate
+    return replace(predicate, _left=cast._expr)
+
+
+def unwrap_casts(predicates: tuple[Expr, ...], types: dict[int, str]) -> tuple[Expr, ...]:
+    unwrapped: tuple[Expr, ...] = tuple(
+        _unwrap_cast(predicate=predicate, types=types) for predicate in predicates
+    )
+    if all(new is old for new, old in zip(unwrapped, predicates)):
+        return predicates
+    return unwrapped
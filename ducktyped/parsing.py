@@ -1,54 +1,164 @@
+import re
+from collections.abc import Iterator, Sequence
 from pathlib import Path
-from typing import Protocol
+from typing import Any, Protocol
 
+from ducktyped.cols import WindowExpr
 from ducktyped.enums import Context, JoinTypes, KeyWord
-from ducktyped.expressions import Expr
+from ducktyped.expressions import Compiler, Expr, literal_sql, walk
+
+_PLACEHOLDER: re.Pattern[str] = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\?")
+
+
+def inline_params(sql: str, params: list[Any]) -> str:
+    values: Iterator[Any] = iter(params)
+
+    def _replace(match: re.Match[str]) -> str:
+        token: str = match.group()
+        if token == "?":
+            return literal_sql(next(values))
+        return token
+
+    return _PLACEHOLDER.sub(_replace, sql)
 
 
 class TableProtocol(Protocol):
     name: str
-    path: Path
+    database: Path | None
+
+    @property
+    def schema(self) -> dict[str, str]: ...
+
+    def files(self) -> list[Path]: ...
+
+    def scan(self, where: Sequence[Expr]) -> str: ...
+
+    def aggregate(self, func: str, column: str) -> Any: ...
 
 
 class SQLParser:
     def __init__(
         self,
-        selected: list[Expr],
-        where_clause: list[Expr],
-        group_by: list[Expr],
-        order_by: list[tuple[Expr, bool]],
-        joins: list[tuple[TableProtocol, Expr, JoinTypes]],
+        selected: tuple[Expr, ...],
+        where_clause: tuple[Expr, ...],
+        group_by: tuple[Expr, ...],
+        order_by: tuple[tuple[Expr, bool], ...],
+        joins: tuple[tuple[TableProtocol, Expr, JoinTypes], ...],
+        limit: tuple[int, int] | None,
+        parent: "SQLParser | None",
     ) -> None:
-        self.select: list[str] = [col.to_sql() for col in selected]
-        self.where: str = ""
-        if where_clause:
-            where_conditions: list[str] = [cond.to_sql() for cond in where_clause]
-            self.where: str = f" {KeyWord.AND} ".join(where_conditions)
-        self.group: str = ""
-        if group_by:
-            self.group: str = ", ".join(col.to_sql() for col in group_by)
-
-        order_parts: list[str] = []
-        if order_by:
-            for expr, is_asc in order_by:
-                direction: KeyWord | KeyWord = KeyWord.ASC if is_asc else KeyWord.DESC
-                order_parts.append(f"{expr.to_sql()} {direction}")
-        self.order: str = ", ".join(order_parts)
-        join_parts: list[str] = []
-        if joins:
-            for table, on_condition, join_type in joins:
-                table_ref: str = f"'{str(table.path)}'"
-                table_ref += f" AS {table.name}"
-                join_parts.append(
-                    f"{join_type} JOIN {table_ref} ON {on_condition.to_sql()}"
+        self._selected: tuple[Expr, ...] = selected
+        self._where_clause: tuple[Expr, ...] = where_clause
+        self._group_by: tuple[Expr, ...] = group_by
+        self._order_by: tuple[tuple[Expr, bool], ...] = order_by
+        self._joins: tuple[tuple[TableProtocol, Expr, JoinTypes], ...] = joins
+        prefix: int = 0
+        if (
+            parent is not None
+            and len(parent._where_clause) <= len(where_clause)
+            and all(a is b for a, b in zip(parent._where_clause, where_clause))
+        ):
+            prefix = len(parent._where_clause)
+        reuse_select: bool = parent is not None and parent._selected is selected
+        reuse_joins: bool = parent is not None and parent._joins is joins
+        reuse_group: bool = parent is not None and parent._group_by is group_by
+        reuse_order: bool = parent is not None and parent._order_by is order_by
+        pending: list[Expr] = [*where_clause[prefix:]]
+        if not reuse_select:
+            pending.extend(selected)
+        if not reuse_joins:
+            pending.extend(on_condition for _, on_condition, _ in joins)
+        if not reuse_group:
+            pending.extend(group_by)
+        if not reuse_order:
+            pending.extend(expr for expr, _ in order_by)
+        if parent is None or any(
+            isinstance(expr, WindowExpr)
+            and expr.spec()
+            and expr.spec() not in parent.windows
+            for expr in walk(roots=pending)
+        ):
+            roots: list[Expr] = [*selected, *where_clause, *group_by]
+            roots.extend(expr for expr, _ in order_by)
+            roots.extend(on_condition for _, on_condition, _ in joins)
+            windows: dict[str, str] = {}
+            for expr in walk(roots=roots):
+                if isinstance(expr, WindowExpr):
+                    spec: str = expr.spec()
+                    if spec and spec not in windows:
+                        windows[spec] = f"w{len(windows)}"
+            if parent is not None and parent.windows != windows:
+                parent = None
+                prefix = 0
+                reuse_select = reuse_joins = reuse_group = reuse_order = False
+                pending = roots
+        else:
+            windows = parent.windows
+        self.windows: dict[str, str] = windows
+        self.window: str = ", ".join(
+            f"{name} {KeyWord.AS} ({spec})" for spec, name in windows.items()
+        )
+        self._compiler: Compiler = Compiler(roots=pending, windows=windows)
+        if parent is not None and reuse_select:
+            self.select: list[str] = parent.select
+        else:
+            self.select = [self._inline_sql(col) for col in selected]
+        if parent is not None and reuse_joins:
+            self.join_types: list[JoinTypes] = parent.join_types
+            self.join_conditions: list[str] = parent.join_conditions
+            self.join_params: list[Any] = parent.join_params
+        else:
+            self.join_types = [join_type for _, _, join_type in joins]
+            self.join_conditions = []
+            self.join_params = []
+            for _, on_condition, _ in joins:
+                self.join_conditions.append(
+                    self._compiler.compile(root=on_condition, params=self.join_params)
                 )
-        self.joins: list[str] = join_parts
+        self.conditions: list[str] = []
+        self.where_params: list[Any] = []
+        if parent is not None and prefix:
+            self.conditions.extend(parent.conditions)
+            self.where_params.extend(parent.where_params)
+        self.conditions.extend(
+            self._compiler.compile(root=cond, params=self.where_params)
+            for cond in where_clause[prefix:]
+        )
+        self.where: str = f" {KeyWord.AND} ".join(self.conditions)
+        self.params: list[Any] = self.join_params + self.where_params
+        if parent is not None and reuse_group:
+            self.group: str = parent.group
+        else:
+            self.group = ", ".join(self._inline_sql(col) for col in group_by)
+        if parent is not None and reuse_order:
+            self.order: str = parent.order
+        else:
+            order_parts: list[str] = []
+            for expr, is_asc in order_by:
+                direction: KeyWord = KeyWord.ASC if is_asc else KeyWord.DESC
+                order_parts.append(f"{self._inline_sql(expr)} {direction}")
+            self.order = ", ".join(order_parts)
+        self.limit: str = ""
+        if limit is not None:
+            self.limit = f"{limit[0]}"
+            if limit[1]:
+                self.limit += f" {Context.OFFSET} {limit[1]}"
+
+    def _inline_sql(self, expr: Expr) -> str:
+        params: list[Any] = []
+        return inline_params(self._compiler.compile(root=expr, params=params), params)
+
+    def _join_sql(self, sources: list[str]) -> list[str]:
+        return [
+            f"{join_type} JOIN {source} ON {on_sql}"
+            for join_type, source, on_sql in zip(self.join_types, sources, self.join_conditions)
+        ]
 
-    def get_explained_query(self, table: str) -> str:
+    def get_explained_query(self, table: str, joins: list[str]) -> str:
         select_sql: str = ",\n    ".join(self.select)
-        query: str = f"{Context.SELECT}\n    {select_sql}\n{Context.FROM} '{table}'"
-        if self.joins:
-            formatted_joins: str = "\n".join(self.joins)
+        query: str = f"{Context.SELECT}\n    {select_sql}\n{Context.FROM} {table}"
+        if joins:
+            formatted_joins: str = "\n".join(self._join_sql(sources=joins))
             query += f"\n{formatted_joins}"
 
         if self.where:
@@ -61,20 +171,26 @@ class SQLParser:
             formatted_group: str = ",\n    ".join(self.group.split(", "))
             query += f"\n{Context.GROUP_BY}\n    {formatted_group}"
 
+        if self.window:
+            formatted_window: str = ",\n    ".join(self.window.split(", "))
+            query += f"\n{Context.WINDOW}\n    {formatted_window}"
+
         if self.order:
             formatted_order: str = ",\n    ".join(self.order.split(", "))
             query += f"\n{Context.ORDER_BY}\n    {formatted_order}"
 
-        return query
+        if self.limit:
+            query += f"\n{Context.LIMIT} {self.limit}"
 
-    def get_executable_query(
-        self,
-        table: str,
-    ) -> str:
+        return inline_params(query, self.params)
+
+    def get_executable_query(self, table: str, joins: list[str]) -> str:
         select_sql: str = ", ".join(self.select)
-        joins_sql: str = " ".join(self.joins) if self.joins else ""
+        joins_sql: str = " ".join(self._join_sql(sources=joins))
         where_sql: str = f" {Context.WHERE} {self.where}" if self.where else ""
         group_sql: str = f" {Context.GROUP_BY} {self.group}" if self.group else ""
+        window_sql: str = f" {Context.WINDOW} {self.window}" if self.window else ""
         order_sql: str = f" {Context.ORDER_BY} {self.order}" if self.order else ""
+        limit_sql: str = f" {Context.LIMIT} {self.limit}" if self.limit else ""
 
-        return f"{Context.SELECT} {select_sql} {Context.FROM} '{table}' {joins_sql}{where_sql}{group_sql}{order_sql}"
+        return f"{Context.SELECT} {select_sql} {Context.FROM} {table} {joins_sql}{where_sql}{group_sql}{window_sql}{order_sql}{limit_sql}"
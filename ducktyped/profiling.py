@@ -0,0 +1,81 @@
+import json
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+_ROOT: str = "QUERY"
+
+
+class OperatorProfile(NamedTuple):
+    name: str
+    timing: float
+    rows: int
+    extra_info: dict[str, Any]
+    children: list["OperatorProfile"]
+
+
+class Usage(NamedTuple):
+    peak_memory: int
+    peak_temp_storage: int
+
+
+class Profile(NamedTuple):
+    query: str
+    stages: dict[str, float]
+    rows: int
+    bytes: int
+    usage: Usage
+    operators: OperatorProfile
+    hottest: OperatorProfile
+
+
+_hook: Callable[[Profile], None] | None = None
+
+
+def set_profile_hook(hook: Callable[[Profile], None] | None) -> None:
+    global _hook
+    _hook = hook
+
+
+def emit(profile: Profile) -> None:
+    if _hook is not None:
+        _hook(profile)
+
+
+def _parse_operator(node: dict[str, Any]) -> OperatorProfile:
+    return OperatorProfile(
+        name=node["operator_name"].strip(),
+        timing=node["operator_timing"],
+        rows=node["operator_cardinality"],
+        extra_info=node["extra_info"],
+        children=[_parse_operator(node=child) for child in node["children"]],
+    )
+
+
+def parse_profile(raw: str) -> OperatorProfile:
+    root: dict[str, Any] = json.loads(raw)
+    return OperatorProfile(
+        name=_ROOT,
+        timing=root["latency"],
+        rows=root["rows_returned"],
+        extra_info=root["extra_info"],
+        children=[_parse_operator(node=child) for child in root["children"]],
+    )
+
+
+def parse_usage(raw: str) -> Usage:
+    root: dict[str, Any] = json.loads(raw)
+    return Usage(
+        peak_memory=root["system_peak_buffer_memory"],
+        peak_temp_storage=root["system_peak_temp_dir_size"],
+    )
+
+
+def hottest(root: OperatorProfile) -> OperatorProfile:
+    best: OperatorProfile = root
+    stack: list[OperatorProfile] = list(root.children)
+    while stack:
+        node: OperatorProfile = stack.pop()
+        if best is root or node.timing > best.timing:
+            best = node
+        stack.extend(node.children)
+    return best
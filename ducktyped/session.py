@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from datetime import date, datetime
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from itertools import count
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ducktyped.cache import FileStamp, ResultCache, file_stamps
+from ducktyped.expressions import literal_sql
+from ducktyped.lazy import LazyModule
+from ducktyped.parsing import inline_params
+
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+else:
+    duckdb = LazyModule(name="duckdb")
+    pa = LazyModule(name="pyarrow")
+
+
+_INTEGER_TYPES: tuple[tuple[int, str], ...] = ((2**31, "INTEGER"), (2**63, "BIGINT"))
+
+
+def _typed_literal(value: Any) -> str | None:
+    kind: type = type(value)
+    if kind is bool:
+        return "true" if value else "false"
+    if kind is int:
+        for bound, dtype in _INTEGER_TYPES:
+            if -bound <= value < bound:
+                return f"{value}::{dtype}"
+        return None
+    if kind is float:
+        return f"'{value!r}'::DOUBLE"
+    if kind is str:
+        return literal_sql(value)
+    if kind is datetime and value.tzinfo is None:
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if kind is date:
+        return f"DATE '{value.isoformat()}'"
+    return None
+
+
+class Resources(NamedTuple):
+    memory_limit: str | None
+    threads: int | None
+    temp_directory: Path | None
+    preserve_insertion_order: bool | None
+
+
+def resource_settings(resources: Resources) -> dict[str, Any]:
+    return {
+        name: str(value) if isinstance(value, Path) else value
+        for name, value in resources._asdict().items()
+        if value is not None
+    }
+
+
+def database_alias(database: Path) -> str:
+    digest: str = hashlib.sha256(str(database.resolve()).encode()).hexdigest()
+    return f"ducktyped_{digest[:16]}"
+
+
+class Session:
+    __slots__ = (
+        "_database",
+        "_statement_cache_size",
+        "_result_cache",
+        "_connection",
+        "_cursors",
+        "_local",
+        "_lock",
+        "_statement_ids",
+        "_attached",
+        "_settings",
+        "_settings_lock",
+    )
+
+    def __init__(
+        self,
+        database: str,
+        statement_cache_size: int,
+        result_cache: ResultCache | None,
+        resources: Resources,
+    ) -> None:
+        self._database: str = database
+        self._settings: dict[str, Any] = {
+            "temp_directory": str(Path(tempfile.gettempdir()).joinpath("ducktyped")),
+            **resource_settings(resources=resources),
+        }
+        self._settings_lock: threading.Lock = threading.Lock()
+        self._statement_cache_size: int = statement_cache_size
+        self._result_cache: ResultCache | None = result_cache
+        self._connection: duckdb.DuckDBPyConnection | None = None
+        self._cursors: list[duckdb.DuckDBPyConnection] = []
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+        self._statement_ids: count[int] = count()
+        self._attached: set[str] = set()
+
+    def _connect(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            if self._connection is None:
+                self._connection = duckdb.connect(
+                    database=self._database, config=self._settings
+                )
+            return self._connection
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        cursor: duckdb.DuckDBPyConnection | None = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._connect().cursor()
+            with self._lock:
+                self._cursors.append(cursor)
+            self._local.cursor = cursor
+            self._local.statements = OrderedDict[str, tuple[str, tuple[FileStamp, ...]]]()
+            self._local.relations = dict[str, pa.Table]()
+        return cursor
+
+    def attach(self, database: Path) -> str:
+        alias: str = database_alias(database=database)
+        connection: duckdb.DuckDBPyConnection = self._connect()
+        with self._lock:
+            if alias not in self._attached:
+                connection.execute(
+                    query=f"ATTACH IF NOT EXISTS {literal_sql(str(database))} AS {alias}"
+                )
+                self._attached.add(alias)
+        return alias
+
+    def execute(
+        self,
+        query: str,
+        params: list[Any],
+        sources: list[Path],
+        relations: dict[str, pa.Table],
+    ) -> duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation:
+        stamps: tuple[FileStamp, ...] = file_stamps(paths=sources)
+        if self._result_cache is None or relations:
+            return self._run(query=query, params=params, stamps=stamps, relations=relations)
+        key: str = inline_params(query, params)
+        table: pa.Table | None = self._result_cache.get(key=key, stamps=stamps)
+        if table is None:
+            table = self._run(
+                query=query, params=params, stamps=stamps, relations=relations
+            ).arrow()
+            self._result_cache.put(key=key, stamps=stamps, table=table)
+        return self.cursor().from_arrow(table)
+
+    def _run(
+        self,
+        query: str,
+        params: list[Any],
+        stamps: tuple[FileStamp, ...],
+        relations: dict[str, pa.Table],
+    ) -> duckdb.DuckDBPyConnection:
+        cursor: duckdb.DuckDBPyConnection = self.cursor()
+        registered: dict[str, pa.Table] = self._local.relations
+        statements: OrderedDict[str, tuple[str, tuple[FileStamp, ...]]] = (
+            self._local.statements
+        )
+        for name, table in registered.items():
+            if relations.get(name) is not table:
+                cursor.unregister(view_name=name)
+        for name, table in relations.items():
+            if registered.get(name) is not table:
+                cursor.register(view_name=name, python_object=table)
+                for sql in [sql for sql in statements if name in sql]:
+                    cursor.execute(query=f"DEALLOCATE {statements.pop(sql)[0]}")
+        self._local.relations = dict(relations)
+        literals: list[str | None] = [_typed_literal(value) for value in params]
+        if self._statement_cache_size <= 0 or None in literals:
+            return cursor.execute(query=query, parameters=params)
+        cached: tuple[str, tuple[FileStamp, ...]] | None = statements.get(query)
+        if cached is not None and cached[1] != stamps:
+            cursor.execute(query=f"DEALLOCATE {statements.pop(query)[0]}")
+            cached = None
+        if cached is None:
+            name: str = f"ducktyped_{next(self._statement_ids)}"
+            cursor.execute(query=f"PREPARE {name} AS {query}")
+            statements[query] = (name, stamps)
+            if len(statements) > self._statement_cache_size:
+                evicted: tuple[str, tuple[str, tuple[FileStamp, ...]]] = statements.popitem(
+                    last=False
+                )
+                cursor.execute(query=f"DEALLOCATE {evicted[1][0]}")
+        else:
+            name = cached[0]
+            statements.move_to_end(query)
+        if not literals:
+            return cursor.execute(query=f"EXECUTE {name}")
+        args: str = ", ".join(literal for literal in literals if literal is not None)
+        return cursor.execute(query=f"EXECUTE {name}({args})")
+
+    def iter_batches(
+        self,
+        query: str,
+        params: list[Any],
+        batch_size: int,
+        relations: dict[str, pa.Table],
+    ) -> Iterator[pa.RecordBatch]:
+        cursor: duckdb.DuckDBPyConnection = self._connect().cursor()
+        try:
+            for name, table in relations.items():
+                cursor.register(view_name=name, python_object=table)
+            reader: pa.RecordBatchReader = cursor.execute(
+                query=query, parameters=params
+            ).fetch_record_batch(rows_per_batch=batch_size)
+            yield from reader
+        finally:
+            cursor.close()
+
+    def execute_isolated(
+        self,
+        query: str,
+        params: list[Any],
+        tables: dict[str, Any],
+        settings: dict[str, Any],
+        resources: Resources | None,
+    ) -> pa.Table:
+        cursor: duckdb.DuckDBPyConnection = self._connect().cursor()
+        overrides: dict[str, Any] = (
+            {} if resources is None else resource_settings(resources=resources)
+        )
+        try:
+            for name, value in settings.items():
+                cursor.execute(query=f"SET {name} = {literal_sql(value)}")
+            for name, table in tables.items():
+                cursor.register(view_name=name, python_object=table)
+            if not overrides:
+                return cursor.execute(query=query, parameters=params).arrow()
+            with self._settings_lock:
+                try:
+                    for name, value in overrides.items():
+                        cursor.execute(query=f"SET GLOBAL {name} = {literal_sql(value)}")
+                    return cursor.execute(query=query, parameters=params).arrow()
+                finally:
+                    for name in overrides:
+                        if name in self._settings:
+                            cursor.execute(
+                                query=f"SET GLOBAL {name} = {literal_sql(self._settings[name])}"
+                            )
+                        else:
+                            cursor.execute(query=f"RESET GLOBAL {name}")
+        finally:
+            cursor.close()
+
+    async def run_async[T](self, func: Callable[[], T]) -> T:
+        cursors: list[duckdb.DuckDBPyConnection] = []
+
+        def _call() -> T:
+            cursors.append(self.cursor())
+            return func()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, _call)
+        except asyncio.CancelledError:
+            for cursor in cursors:
+                cursor.interrupt()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors.clear()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+            self._attached.clear()
+            self._local = threading.local()
+
+
+default_session: Session = Session(
+    database=":memory:",
+    statement_cache_size=256,
+    result_cache=None,
+    resources=Resources(
+        memory_limit=None, threads=None, temp_directory=None, preserve_insertion_order=None
+    ),
+)
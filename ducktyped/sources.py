@@ -0,0 +1,212 @@
+import os
+from collections.abc import Sequence
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from ducktyped.cols import Col
+from ducktyped.enums import Operators, Readers
+from ducktyped.expressions import BinaryOpExpr, Expr, InExpr, LiteralExpr, literal_sql
+
+_GLOB_CHARS: tuple[str, ...] = ("*", "?", "[")
+_HIVE_NULL: str = "__HIVE_DEFAULT_PARTITION__"
+
+
+class Listing(NamedTuple):
+    directories: tuple[tuple[str, int], ...]
+    files: tuple[Path, ...]
+
+
+_listings: dict[tuple[Path, str], Listing] = {}
+
+
+def _is_glob(path: Path) -> bool:
+    return any(char in part for part in path.parts for char in _GLOB_CHARS)
+
+
+def _glob_base(path: Path) -> Path:
+    base: list[str] = []
+    for part in path.parts:
+        if any(char in part for char in _GLOB_CHARS):
+            break
+        base.append(part)
+    return Path(*base)
+
+
+def _strip_partitions(path: Path) -> Path:
+    while "=" in path.name:
+        path = path.parent
+    return path
+
+
+def is_single_file(path: Path | list[Path]) -> bool:
+    return isinstance(path, Path) and not _is_glob(path) and not path.is_dir()
+
+
+def source_name(path: Path | list[Path]) -> str:
+    if isinstance(path, list):
+        common: Path = Path(os.path.commonpath([file.resolve() for file in path]))
+        if len(path) == 1:
+            return common.stem
+        return _strip_partitions(path=common).name
+    if _is_glob(path):
+        return _strip_partitions(path=_glob_base(path=path)).name
+    if path.is_dir():
+        return path.name
+    return path.stem
+
+
+def _fresh(listing: Listing) -> bool:
+    try:
+        return all(
+            os.stat(directory).st_mtime_ns == mtime_ns
+            for directory, mtime_ns in listing.directories
+        )
+    except OSError:
+        return False
+
+
+def _walk(base: Path, pattern: str) -> Listing:
+    directories: list[tuple[str, int]] = []
+    files: list[Path] = []
+    pending: list[str] = [str(base)]
+    while pending:
+        directory: str = pending.pop()
+        directories.append((directory, os.stat(directory).st_mtime_ns))
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif not entry.is_file():
+                    continue
+                elif pattern:
+                    file: Path = Path(entry.path)
+                    if file.relative_to(base).full_match(pattern):
+                        files.append(file)
+                elif not entry.name.startswith((".", "_")):
+                    files.append(Path(entry.path))
+    return Listing(directories=tuple(directories), files=tuple(sorted(files)))
+
+
+def _cached_listing(base: Path, pattern: str) -> list[Path]:
+    listing: Listing | None = _listings.get((base, pattern))
+    if listing is None or not _fresh(listing=listing):
+        listing = _walk(base=base, pattern=pattern)
+        _listings[(base, pattern)] = listing
+    return list(listing.files)
+
+
+def list_files(path: Path | list[Path]) -> list[Path]:
+    if isinstance(path, list):
+        return path
+    if _is_glob(path):
+        base: Path = _glob_base(path=path)
+        return _cached_listing(base=base, pattern=str(path.relative_to(base)))
+    if path.is_dir():
+        return _cached_listing(base=path, pattern="")
+    return [path]
+
+
+def hive_partitions(file: Path) -> dict[str, str]:
+    partitions: dict[str, str] = {}
+    for part in file.parts[:-1]:
+        key, sep, value = part.partition("=")
+        if sep:
+            partitions[key] = value
+    return partitions
+
+
+def hive_bounds(file: Path) -> dict[str, tuple[Any, Any]]:
+    return {
+        key: (value, value)
+        for key, value in hive_partitions(file=file).items()
+        if value != _HIVE_NULL
+    }
+
+
+def _coerce(raw: Any, like: Any) -> Any:
+    if not isinstance(raw, str) or isinstance(like, str):
+        return raw
+    if isinstance(like, bool):
+        return raw.lower() == "true"
+    if isinstance(like, int):
+        return int(raw)
+    if isinstance(like, float):
+        return float(raw)
+    if isinstance(like, datetime):
+        return datetime.fromisoformat(raw)
+    if isinstance(like, date):
+        return date.fromisoformat(raw)
+    return raw
+
+
+def _in_range(op: Operators, low: Any, high: Any, value: Any) -> bool:
+    low = _coerce(raw=low, like=value)
+    high = _coerce(raw=high, like=value)
+    match op:
+        case Operators.EQ:
+            return low <= value <= high
+        case Operators.NEQ:
+            return not low == high == value
+        case Operators.GT:
+            return high > value
+        case Operators.GTE:
+            return high >= value
+        case Operators.LT:
+            return low < value
+        case Operators.LTE:
+            return low <= value
+        case _:
+            return True
+
+
+def _bounded_col(
+    expr: Expr, table: str, bounds: dict[str, tuple[Any, Any]]
+) -> tuple[Any, Any] | None:
+    if not isinstance(expr, Col) or expr.table not in (None, table):
+        return None
+    return bounds.get(expr._name)
+
+
+def _may_match(cond: Expr, table: str, bounds: dict[str, tuple[Any, Any]]) -> bool:
+    try:
+        if isinstance(cond, BinaryOpExpr):
+            col_bounds: tuple[Any, Any] | None = _bounded_col(cond._left, table, bounds)
+            if col_bounds is None or not isinstance(cond._right, LiteralExpr):
+                return True
+            return _in_range(cond._op, *col_bounds, value=cond._right._value)
+        if isinstance(cond, InExpr):
+            col_bounds = _bounded_col(cond._expr, table, bounds)
+            if col_bounds is None or any(isinstance(v, Expr) for v in cond._values):
+                return True
+            return any(
+                _in_range(Operators.EQ, *col_bounds, value=v) for v in cond._values
+            )
+    except (TypeError, ValueError):
+        return True
+    return True
+
+
+def prune(
+    files: list[Path],
+    table: str,
+    where: Sequence[Expr],
+    bounds: list[dict[str, tuple[Any, Any]]],
+) -> list[Path]:
+    kept: list[Path] = [
+        file
+        for file, file_bounds in zip(files, bounds)
+        if all(_may_match(cond=cond, table=table, bounds=file_bounds) for cond in where)
+    ]
+    return kept or files[:1]
+
+
+def scan_sql(files: list[Path]) -> str:
+    suffixes: set[str] = {file.suffix for file in files}
+    if len(suffixes) > 1:
+        raise ValueError(
+            f"Cannot scan files with different suffixes together: {', '.join(sorted(suffixes))}"
+        )
+    reader: Readers = Readers.READ_CSV if files[0].suffix == ".csv" else Readers.READ_PARQUET
+    paths: str = ", ".join(literal_sql(str(file)) for file in files)
+    return f"{reader}([{paths}], hive_partitioning = true)"
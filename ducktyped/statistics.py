@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ducktyped.cache import FileStamp, file_stamps
+from ducktyped.enums import Functions
+from ducktyped.lazy import LazyModule
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+else:
+    pa = LazyModule(name="pyarrow")
+    pq = LazyModule(name="pyarrow.parquet")
+
+_UNBOUNDED_TYPES: tuple[str, ...] = ("FLOAT", "DOUBLE", "INT96")
+
+
+class ColumnStats(NamedTuple):
+    null_count: int | None
+    min: Any
+    max: Any
+    bounded: bool
+
+
+class RowGroupStats(NamedTuple):
+    num_rows: int
+    columns: dict[str, ColumnStats]
+
+
+class FileStats(NamedTuple):
+    stamp: FileStamp
+    row_groups: list[RowGroupStats]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"decimal": str(value)}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if "datetime" in value:
+        return datetime.fromisoformat(value["datetime"])
+    if "date" in value:
+        return date.fromisoformat(value["date"])
+    return Decimal(value["decimal"])
+
+
+def _read_column(statistics: pq.Statistics | None) -> ColumnStats:
+    if statistics is None:
+        return ColumnStats(null_count=None, min=None, max=None, bounded=False)
+    null_count: int | None = (
+        statistics.null_count if statistics.has_null_count else None
+    )
+    unbounded: ColumnStats = ColumnStats(
+        null_count=null_count, min=None, max=None, bounded=False
+    )
+    if not statistics.has_min_max or statistics.physical_type in _UNBOUNDED_TYPES:
+        return unbounded
+    try:
+        low: Any = statistics.min
+        high: Any = statistics.max
+    except (pa.ArrowNotImplementedError, ValueError):
+        return unbounded
+    if not isinstance(low, int | str | date | Decimal):
+        return unbounded
+    return ColumnStats(null_count=null_count, min=low, max=high, bounded=True)
+
+
+def _read_file(stamp: FileStamp) -> FileStats:
+    metadata: pq.FileMetaData = pq.read_metadata(stamp.path)
+    row_groups: list[RowGroupStats] = []
+    for i in range(metadata.num_row_groups):
+        row_group: pq.RowGroupMetaData = metadata.row_group(i)
+        columns: dict[str, ColumnStats] = {}
+        for j in range(row_group.num_columns):
+            column: pq.ColumnChunkMetaData = row_group.column(j)
+            if "." not in column.path_in_schema:
+                columns[column.path_in_schema] = _read_column(column.statistics)
+        row_groups.append(RowGroupStats(num_rows=row_group.num_rows, columns=columns))
+    return FileStats(stamp=stamp, row_groups=row_groups)
+
+
+def file_bounds(stats: FileStats) -> dict[str, tuple[Any, Any]]:
+    bounds: dict[str, tuple[Any, Any]] = {}
+    names: set[str] = set()
+    for row_group in stats.row_groups:
+        names.update(row_group.columns)
+    for name in names:
+        low: Any = None
+        high: Any = None
+        for row_group in stats.row_groups:
+            column: ColumnStats | None = row_group.columns.get(name)
+            if column is None or not column.bounded:
+                if row_group.num_rows and (
+                    column is None or column.null_count != row_group.num_rows
+                ):
+                    break
+                continue
+            low = column.min if low is None else min(low, column.min)
+            high = column.max if high is None else max(high, column.max)
+        else:
+            if low is not None:
+                bounds[name] = (low, high)
+    return bounds
+
+
+class StatisticsIndex:
+    __slots__ = ("_sidecar", "_files", "_lock")
+
+    def __init__(self, sidecar: Path | None) -> None:
+        self._sidecar: Path | None = sidecar
+        self._files: dict[str, FileStats] = {}
+        self._lock: threading.Lock = threading.Lock()
+        if sidecar is not None and sidecar.exists():
+            self._files = self._load(sidecar=sidecar)
+
+    def _load(self, sidecar: Path) -> dict[str, FileStats]:
+        files: dict[str, FileStats] = {}
+        for path, entry in json.loads(sidecar.read_text()).items():
+            row_groups: list[RowGroupStats] = [
+                RowGroupStats(
+                    num_rows=row_group["num_rows"],
+                    columns={
+                        name: ColumnStats(
+                            null_count=column["null_count"],
+                            min=_decode(column["min"]),
+                            max=_decode(column["max"]),
+                            bounded=column["bounded"],
+                        )
+                        for name, column in row_group["columns"].items()
+                    },
+                )
+                for row_group in entry["row_groups"]
+            ]
+            files[path] = FileStats(stamp=FileStamp(*entry["stamp"]), row_groups=row_groups)
+        return files
+
+    def _save(self, sidecar: Path) -> None:
+        content: dict[str, Any] = {
+            path: {
+                "stamp": list(stats.stamp),
+                "row_groups": [
+                    {
+                        "num_rows": row_group.num_rows,
+                        "columns": {
+                            name: {
+                                "null_count": column.null_count,
+                                "min": _encode(column.min),
+                                "max": _encode(column.max),
+                                "bounded": column.bounded,
+                            }
+                            for name, column in row_group.columns.items()
+                        },
+                    }
+                    for row_group in stats.row_groups
+                ],
+            }
+            for path, stats in self._files.items()
+        }
+        tmp: Path = sidecar.with_suffix(".tmp")
+        tmp.write_text(json.dumps(content))
+        tmp.replace(sidecar)
+
+    def get(self, files: list[Path]) -> list[FileStats]:
+        stats: list[FileStats] = []
+        changed: bool = False
+        for stamp in file_stamps(paths=files):
+            with self._lock:
+                cached: FileStats | None = self._files.get(stamp.path)
+            if cached is None or cached.stamp != stamp:
+                cached = _read_file(stamp=stamp)
+                changed = True
+                with self._lock:
+                    self._files[stamp.path] = cached
+            stats.append(cached)
+        if changed and self._sidecar is not None:
+            with self._lock:
+                self._save(sidecar=self._sidecar)
+        return stats
+
+    def aggregate(self, files: list[Path], func: str, column: str) -> Any:
+        if func == Functions.COUNT:
+            total: int = 0
+            for stats in self.get(files=files):
+                for row_group in stats.row_groups:
+                    column_stats: ColumnStats | None = row_group.columns.get(column)
+                    if column_stats is None or column_stats.null_count is None:
+                        return None
+                    total += row_group.num_rows - column_stats.null_count
+            return total
+        if func not in (Functions.MIN, Functions.MAX):
+            return None
+        values: list[Any] = []
+        for stats in self.get(files=files):
+            bounds: dict[str, tuple[Any, Any]] = file_bounds(stats=stats)
+            if column not in bounds:
+                return None
+            values.append(bounds[column][0 if func == Functions.MIN else 1])
+        if not values:
+            return None
+        return min(values) if func == Functions.MIN else max(values)
@@ -0,0 +1,201 @@
+from collections.abc import Iterable
+from datetime import date, time
+from decimal import Decimal
+from typing import Any
+
+from ducktyped.cols import Col, WindowExpr
+from ducktyped.enums import Functions, Operators, TypeFamily, Types
+from ducktyped.expressions import (
+    AggExpr,
+    BinaryOpExpr,
+    CastExpr,
+    Expr,
+    InExpr,
+    LiteralExpr,
+    UnaryFuncExpr,
+    _wrap_value,
+    walk,
+)
+from ducktyped.parsing import inline_params
+
+_NUMERIC_TYPES: tuple[str, ...] = (
+    Types.TINYINT,
+    Types.SMALLINT,
+    Types.INTEGER,
+    Types.BIGINT,
+    Types.UTINYINT,
+    Types.USMALLINT,
+    Types.UINTEGER,
+    Types.UBIGINT,
+    Types.FLOAT,
+    Types.DOUBLE,
+    Types.DECIMAL,
+    "HUGEINT",
+    "UHUGEINT",
+)
+_ARITHMETIC: tuple[Operators, ...] = (
+    Operators.ADD,
+    Operators.SUBTRACT,
+    Operators.MULTIPLY,
+    Operators.DIVIDE,
+)
+_COMPARABLE: dict[TypeFamily, set[TypeFamily]] = {
+    TypeFamily.NUMERIC: {TypeFamily.NUMERIC, TypeFamily.BOOLEAN, TypeFamily.STRING},
+    TypeFamily.BOOLEAN: {TypeFamily.BOOLEAN, TypeFamily.NUMERIC, TypeFamily.STRING},
+    TypeFamily.TEMPORAL: {TypeFamily.TEMPORAL, TypeFamily.STRING},
+    TypeFamily.STRING: {TypeFamily.STRING},
+}
+_CASTABLE: dict[TypeFamily, set[TypeFamily]] = {
+    TypeFamily.NUMERIC: {TypeFamily.NUMERIC, TypeFamily.BOOLEAN, TypeFamily.STRING},
+    TypeFamily.BOOLEAN: {TypeFamily.BOOLEAN, TypeFamily.NUMERIC, TypeFamily.STRING},
+    TypeFamily.TEMPORAL: {TypeFamily.TEMPORAL, TypeFamily.STRING},
+}
+_FUNCTION_FAMILIES: dict[str, set[TypeFamily]] = {
+    Functions.SUM: {TypeFamily.NUMERIC, TypeFamily.BOOLEAN},
+    Functions.AVG: {TypeFamily.NUMERIC, TypeFamily.TEMPORAL},
+    Functions.KURTOSIS: {TypeFamily.NUMERIC},
+    Functions.SKEWNESS: {TypeFamily.NUMERIC},
+    Functions.STDDEV_SAMP: {TypeFamily.NUMERIC},
+    Functions.ABS: {TypeFamily.NUMERIC},
+    Functions.SIGN: {TypeFamily.NUMERIC},
+    Functions.SQRT: {TypeFamily.NUMERIC},
+}
+
+
+def type_family(dtype: str) -> TypeFamily:
+    base: str = dtype.split("(")[0].strip()
+    if base.endswith("]"):
+        return TypeFamily.OTHER
+    if base in _NUMERIC_TYPES:
+        return TypeFamily.NUMERIC
+    if base == Types.VARCHAR:
+        return TypeFamily.STRING
+    if base == Types.BOOLEAN:
+        return TypeFamily.BOOLEAN
+    if base.startswith((Types.DATE, Types.TIME)):
+        return TypeFamily.TEMPORAL
+    return TypeFamily.OTHER
+
+
+def _literal_family(value: Any) -> TypeFamily:
+    if isinstance(value, bool):
+        return TypeFamily.BOOLEAN
+    if isinstance(value, int | float | Decimal):
+        return TypeFamily.NUMERIC
+    if isinstance(value, str):
+        return TypeFamily.STRING
+    if isinstance(value, date | time):
+        return TypeFamily.TEMPORAL
+    return TypeFamily.OTHER
+
+
+def _family(expr: Expr, types: dict[int, str]) -> TypeFamily:
+    if isinstance(expr, LiteralExpr):
+        return _literal_family(value=expr._value)
+    if isinstance(expr, CastExpr):
+        return type_family(dtype=expr._dtype.to_sql())
+    dtype: str | None = types.get(id(expr))
+    if dtype is None:
+        return TypeFamily.OTHER
+    return type_family(dtype=dtype)
+
+
+def _sql(expr: Expr) -> str:
+    params: list[Any] = []
+    return inline_params(expr.to_sql(params=params), params)
+
+
+def _resolve(
+    col: Col, schemas: dict[str, dict[str, str]], aliases: set[str]
+) -> str | None:
+    name: str = col._name.lower()
+    if col.table is not None:
+        schema: dict[str, str] | None = schemas.get(col.table)
+        if schema is None:
+            raise ValueError(f"Table {col.table} is not part of the query")
+        if name not in schema:
+            raise ValueError(f"Column {col.name} not found in {col.table}")
+        return schema[name]
+    for schema in schemas.values():
+        if name in schema:
+            return schema[name]
+    if name in aliases:
+        return None
+    raise ValueError(f"Column {col.name} not found in {', '.join(schemas)}")
+
+
+def _check_comparison(left: Expr, right: Expr, types: dict[int, str]) -> None:
+    left_family: TypeFamily = _family(expr=left, types=types)
+    right_family: TypeFamily = _family(expr=right, types=types)
+    if TypeFamily.OTHER in (left_family, right_family):
+        return
+    if isinstance(right, LiteralExpr):
+        valid: bool = right_family in _COMPARABLE[left_family]
+    elif isinstance(left, LiteralExpr):
+        valid = left_family in _COMPARABLE[right_family]
+    else:
+        valid = (
+            right_family in _COMPARABLE[left_family]
+            and left_family in _COMPARABLE[right_family]
+        )
+    if not valid:
+        raise ValueError(
+            f"Cannot compare {_sql(expr=left)} ({left_family}) with {_sql(expr=right)} ({right_family})"
+        )
+
+
+def _check_function(func: str, operand: Expr, types: dict[int, str]) -> None:
+    allowed: set[TypeFamily] | None = _FUNCTION_FAMILIES.get(func)
+    family: TypeFamily = _family(expr=operand, types=types)
+    if allowed is not None and family != TypeFamily.OTHER and family not in allowed:
+        raise ValueError(f"{func} does not accept {_sql(expr=operand)} ({family})")
+
+
+def _check(node: Expr, types: dict[int, str]) -> None:
+    if isinstance(node, BinaryOpExpr):
+        if node._op not in _ARITHMETIC:
+            _check_comparison(left=node._left, right=node._right, types=types)
+            return
+        for operand in (node._left, node._right):
+            family: TypeFamily = _family(expr=operand, types=types)
+            if not isinstance(operand, LiteralExpr) and family in (
+                TypeFamily.STRING,
+                TypeFamily.BOOLEAN,
+            ):
+                raise ValueError(
+                    f"Cannot apply {node._op} to {_sql(expr=operand)} ({family})"
+                )
+    elif isinstance(node, InExpr):
+        for value in node._values:
+            _check_comparison(left=node._expr, right=_wrap_value(value=value), types=types)
+    elif isinstance(node, AggExpr | UnaryFuncExpr):
+        _check_function(func=node._func, operand=node._expr, types=types)
+    elif isinstance(node, WindowExpr):
+        _check_function(func=node.func, operand=node.col, types=types)
+    elif isinstance(node, CastExpr):
+        source: TypeFamily = _family(expr=node._expr, types=types)
+        target: TypeFamily = type_family(dtype=node._dtype.to_sql())
+        castable: set[TypeFamily] | None = _CASTABLE.get(source)
+        if castable is not None and target != TypeFamily.OTHER and target not in castable:
+            raise ValueError(
+                f"Cannot cast {_sql(expr=node._expr)} ({source}) to {node._dtype.to_sql()}"
+            )
+
+
+def validate(
+    exprs: Iterable[Expr], schemas: dict[str, dict[str, str]], aliases: set[str]
+) -> dict[int, str]:
+    lowered: dict[str, dict[str, str]] = {
+        table: {name.lower(): dtype for name, dtype in schema.items()}
+        for table, schema in schemas.items()
+    }
+    nodes: list[Expr] = list(walk(roots=exprs))
+    types: dict[int, str] = {}
+    for node in nodes:
+        if isinstance(node, Col):
+            dtype: str | None = _resolve(col=node, schemas=lowered, aliases=aliases)
+            if dtype is not None:
+                types[id(node)] = dtype
+    for node in nodes:
+        _check(node=node, types=types)
+    return types
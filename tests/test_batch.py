@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import ducktyped as dk
+
+
+def test_batch_matches_single_queries_with_alias_predicates(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("prices.parquet")
+    pl.DataFrame(
+        {"ticker": ["SPY", "QQQ"] * 10, "close": [float(i) for i in range(20)]}
+    ).write_parquet(path)
+    prices: dk.TABLE = dk.TABLE(path)
+    queries: list[dk.Query] = [
+        dk.SELECT(dk.col.close.mul(2).alias("doubled"))
+        .FROM(prices)
+        .WHERE(dk.col.doubled.gt(20)),
+        dk.SELECT(dk.col.close).FROM(prices).WHERE(dk.col.close.gt(10)),
+        dk.SELECT(prices.col("close")).FROM(prices).WHERE(prices.col("close").lt(5)),
+    ]
+    for shared, query in zip(dk.batch(queries), queries):
+        assert_frame_equal(shared, query.execute_to_pl())
@@ -0,0 +1,37 @@
+import os
+from pathlib import Path
+
+import pyarrow as pa
+
+import ducktyped as dk
+from ducktyped.cache import FileStamp
+
+STAMPS: tuple[FileStamp, ...] = (FileStamp(path="prices.parquet", mtime_ns=1, size=1),)
+
+
+def _table(rows: int) -> pa.Table:
+    return pa.table({"close": pa.array(range(rows), type=pa.int64())})
+
+
+def _put(cache: dk.ResultCache, directory: Path, key: str, table: pa.Table, at: int) -> None:
+    existing: set[Path] = set(directory.glob("*.arrow"))
+    cache.put(key=key, stamps=STAMPS, table=table)
+    for file in set(directory.glob("*.arrow")) - existing:
+        os.utime(file, ns=(at, at))
+
+
+def test_disk_tier_evicts_the_oldest_files_past_the_budget(tmp_path: Path) -> None:
+    table: pa.Table = _table(rows=1000)
+    cache: dk.ResultCache = dk.ResultCache(max_bytes=3 * table.nbytes, directory=tmp_path)
+    for at, key in enumerate(["a", "b", "c"]):
+        _put(cache=cache, directory=tmp_path, key=key, table=table, at=at * 10**9)
+    assert sum(file.stat().st_size for file in tmp_path.glob("*.arrow")) <= 3 * table.nbytes
+    reopened: dk.ResultCache = dk.ResultCache(max_bytes=3 * table.nbytes, directory=tmp_path)
+    assert reopened.get(key="a", stamps=STAMPS) is None
+    assert reopened.get(key="c", stamps=STAMPS) == table
+
+
+def test_tables_larger_than_the_budget_are_not_written(tmp_path: Path) -> None:
+    cache: dk.ResultCache = dk.ResultCache(max_bytes=100, directory=tmp_path)
+    cache.put(key="large", stamps=STAMPS, table=_table(rows=1000))
+    assert list(tmp_path.glob("*.arrow")) == []
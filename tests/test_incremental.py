@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+from pathlib import Path
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+import ducktyped as dk
+
+TICKERS: list[str] = ["SPY", "QQQ", "IWM"]
+KEY: list[str] = ["ticker", "date"]
+
+
+def _write_days(directory: Path, name: str, start: int, stop: int) -> None:
+    rows: list[int] = list(range(start * len(TICKERS), stop * len(TICKERS)))
+    pl.DataFrame(
+        {
+            "date": [date(2000, 1, 1) + timedelta(days=i // len(TICKERS)) for i in rows],
+            "ticker": [TICKERS[i % len(TICKERS)] for i in rows],
+            "close": [float(i * 37 % 101) + i / 7 for i in rows],
+        }
+    ).write_parquet(directory.joinpath(f"{name}.parquet"))
+
+
+def _query(table: dk.TABLE) -> dk.Query:
+    return (
+        dk.SELECT(
+            dk.col.date,
+            dk.col.ticker,
+            dk.col.close.rolling_mean(20).over(dk.col.ticker, order_by=dk.col.date).alias("mean"),
+            dk.col.close.rolling_stdev(50).over(dk.col.ticker, order_by=dk.col.date).alias("stdev"),
+            dk.col.close.rolling_sum(5).over(dk.col.ticker, order_by=dk.col.date).alias("total"),
+        )
+        .FROM(table)
+        .WHERE(dk.col.close.gt(1))
+    )
+
+
+def test_incremental_matches_full_execution_across_appends(tmp_path: Path) -> None:
+    source: Path = tmp_path.joinpath("source")
+    source.mkdir()
+    state: Path = tmp_path.joinpath("state")
+    table: dk.TABLE = dk.TABLE(source)
+    _write_days(directory=source, name="initial", start=0, stop=2000)
+    for i, (start, stop) in enumerate([(2000, 2001), (2001, 2300), (2300, 2310), (2310, 3000)]):
+        _write_days(directory=source, name=f"append_{i}", start=start, stop=stop)
+        incremental: pl.DataFrame = _query(table=table).execute_incremental(state=state)
+        full: pl.DataFrame = _query(table=table).execute_to_pl()
+        assert_frame_equal(incremental.sort(KEY), full.sort(KEY))
+
+
+def test_incremental_without_new_rows_returns_stored_output(tmp_path: Path) -> None:
+    source: Path = tmp_path.joinpath("source")
+    source.mkdir()
+    state: Path = tmp_path.joinpath("state")
+    table: dk.TABLE = dk.TABLE(source)
+    _write_days(directory=source, name="initial", start=0, stop=500)
+    first: pl.DataFrame = _query(table=table).execute_incremental(state=state)
+    second: pl.DataFrame = _query(table=table).execute_incremental(state=state)
+    assert_frame_equal(first.sort(KEY), second.sort(KEY))
+
+
+def test_incremental_keeps_rows_of_a_lagging_partition(tmp_path: Path) -> None:
+    source: Path = tmp_path.joinpath("source")
+    source.mkdir()
+    state: Path = tmp_path.joinpath("state")
+    table: dk.TABLE = dk.TABLE(source)
+    _write_days(directory=source, name="initial", start=0, stop=300)
+    _query(table=table).execute_incremental(state=state)
+    leading: pl.DataFrame = pl.read_parquet(source.joinpath("initial.parquet")).with_columns(
+        pl.col("date") + timedelta(days=300)
+    )
+    leading.filter(pl.col("ticker") != "IWM").write_parquet(source.joinpath("leading.parquet"))
+    _query(table=table).execute_incremental(state=state)
+    leading.filter(pl.col("ticker") == "IWM").write_parquet(source.joinpath("lagging.parquet"))
+    incremental: pl.DataFrame = _query(table=table).execute_incremental(state=state)
+    full: pl.DataFrame = _query(table=table).execute_to_pl()
+    assert incremental.height == full.height
+    assert_frame_equal(incremental.sort(KEY), full.sort(KEY))
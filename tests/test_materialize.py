@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import polars as pl
+
+import ducktyped as dk
+
+
+def _write_rows(path: Path, start: int, stop: int) -> None:
+    pl.DataFrame({"id": list(range(start, stop))}).write_parquet(path)
+
+
+def _count(table: dk.TABLE) -> int:
+    return dk.SELECT(dk.col.id.count()).FROM(table).execute_scalar()
+
+
+def test_appended_files_survive_a_fresh_table_on_the_same_database(
+    tmp_path: Path,
+) -> None:
+    source: Path = tmp_path.joinpath("source")
+    source.mkdir()
+    _write_rows(path=source.joinpath("part.parquet"), start=0, stop=1500)
+    extra: Path = tmp_path.joinpath("extra.parquet")
+    _write_rows(path=extra, start=1500, stop=2000)
+    database: Path = tmp_path.joinpath("ids.duckdb")
+    table: dk.TABLE = dk.TABLE(source).materialize(database=database, sort_by=[])
+    assert table.append(new_files=[extra]) == [extra]
+    assert _count(table=table) == 2000
+    reopened: dk.TABLE = dk.TABLE(source).materialize(database=database, sort_by=[])
+    assert reopened.stale() == []
+    assert _count(table=reopened) == 2000
+
+
+def test_deleted_appended_file_is_dropped_on_rebuild(tmp_path: Path) -> None:
+    base: Path = tmp_path.joinpath("base.parquet")
+    _write_rows(path=base, start=0, stop=10)
+    extra: Path = tmp_path.joinpath("extra.parquet")
+    _write_rows(path=extra, start=10, stop=15)
+    database: Path = tmp_path.joinpath("ids.duckdb")
+    table: dk.TABLE = dk.TABLE(base).materialize(database=database, sort_by=[])
+    table.append(new_files=[extra])
+    extra.unlink()
+    reopened: dk.TABLE = dk.TABLE(base).materialize(database=database, sort_by=[])
+    assert reopened.stale() == []
+    assert _count(table=reopened) == 10
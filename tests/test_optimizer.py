@@ -0,0 +1,124 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+
+import ducktyped as dk
+
+PRICES: dk.TABLE = dk.TABLE(Path("prices.parquet"))
+
+
+def _explain(query: dk.Query) -> list[str]:
+    return [line.strip() for line in query.explain().splitlines()]
+
+
+def _operators(operator: dk.OperatorProfile) -> Iterator[dk.OperatorProfile]:
+    yield operator
+    for child in operator.children:
+        yield from _operators(operator=child)
+
+
+def _scan_filters(query: dk.Query) -> list[str]:
+    return [
+        operator.extra_info["Filters"]
+        for operator in _operators(operator=query.profile().operators)
+        if "Filters" in operator.extra_info
+    ]
+
+
+def _write_volumes(path: Path) -> None:
+    pl.DataFrame(
+        {
+            "volume": pl.Series(range(100), dtype=pl.Int32),
+            "shares": pl.Series(range(2**60, 2**60 + 100), dtype=pl.Int64),
+        }
+    ).write_parquet(path)
+
+
+def test_nested_clips_are_merged() -> None:
+    query: dk.Query = dk.SELECT(
+        dk.col.close.clip(0, 1).clip(0, 0.5).alias("clipped")
+    ).FROM(PRICES)
+    assert "LEAST(GREATEST(close, 0.0), 0.5) AS clipped" in _explain(query=query)
+
+
+def test_disjoint_clips_collapse_to_the_outer_bound() -> None:
+    query: dk.Query = dk.SELECT(dk.col.close.clip(0, 1).clip(5, 10).alias("clipped")).FROM(
+        PRICES
+    )
+    assert "LEAST(GREATEST(close, 5), 5) AS clipped" in _explain(query=query)
+
+
+def test_repeated_cast_to_the_same_type_is_emitted_once() -> None:
+    query: dk.Query = dk.SELECT(
+        dk.col.close.cast(dk.Float64()).cast(dk.Float64()).alias("close")
+    ).FROM(PRICES)
+    assert "CAST(close AS DOUBLE) AS close" in _explain(query=query)
+
+
+def test_cast_to_a_different_type_is_kept() -> None:
+    query: dk.Query = dk.SELECT(
+        dk.col.close.cast(dk.Int32()).cast(dk.Float64()).alias("close")
+    ).FROM(PRICES)
+    assert "CAST(CAST(close AS INTEGER) AS DOUBLE) AS close" in _explain(query=query)
+
+
+def test_duplicate_predicates_are_emitted_once() -> None:
+    query: dk.Query = (
+        dk.SELECT(dk.col.close)
+        .FROM(PRICES)
+        .WHERE(dk.col.ticker.eq("SPY"), dk.col.ticker.eq("SPY"))
+        .WHERE(dk.col.ticker.eq("SPY"), dk.col.close.gt(1))
+    )
+    lines: list[str] = _explain(query=query)
+    assert lines[lines.index("WHERE") + 1 :] == ["(ticker = 'SPY')", "AND (close > 1)"]
+
+
+def test_predicates_with_different_values_are_kept() -> None:
+    query: dk.Query = (
+        dk.SELECT(dk.col.close)
+        .FROM(PRICES)
+        .WHERE(dk.col.close.gt(1), dk.col.close.gt(1.0), dk.col.close.gt(2))
+    )
+    lines: list[str] = _explain(query=query)
+    assert lines[lines.index("WHERE") + 1 :] == [
+        "(close > 1)",
+        "AND (close > 1.0)",
+        "AND (close > 2)",
+    ]
+
+
+def test_floating_point_chains_are_not_regrouped() -> None:
+    query: dk.Query = dk.SELECT(dk.col.close.add(0.1).add(0.2).alias("shifted")).FROM(
+        PRICES
+    )
+    assert "((close + 0.1) + 0.2) AS shifted" in _explain(query=query)
+
+
+def test_exact_cast_in_a_comparison_is_pushed_into_the_scan(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("volumes.parquet")
+    _write_volumes(path=path)
+    query: dk.Query = (
+        dk.SELECT(dk.col.volume)
+        .FROM(dk.TABLE(path))
+        .WHERE(dk.col.volume.cast(dk.Float64()).gt(90))
+    )
+    assert _scan_filters(query=query) == ["volume>90"]
+    assert query.execute_to_pl().height == 9
+
+
+def test_inexact_casts_in_comparisons_are_kept(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("volumes.parquet")
+    _write_volumes(path=path)
+    volumes: dk.TABLE = dk.TABLE(path)
+    fractional: dk.Query = (
+        dk.SELECT(dk.col.volume).FROM(volumes).WHERE(dk.col.volume.cast(dk.Float64()).gt(90.5))
+    )
+    assert _scan_filters(query=fractional) == ["(CAST(volume AS DOUBLE) > 90.5)"]
+    rounded: dk.Query = (
+        dk.SELECT(dk.col.shares)
+        .FROM(volumes)
+        .WHERE(dk.col.shares.cast(dk.Float64()).eq(2**60 + 1))
+    )
+    assert "CAST(shares AS DOUBLE)" in rounded.profile().query
+    assert rounded.execute_to_pl().height == 100
@@ -0,0 +1,34 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import ducktyped as dk
+
+
+@pytest.fixture
+def preview() -> Iterator[None]:
+    dk.set_preview_rows(5)
+    yield
+    dk.set_preview_rows(0)
+
+
+def test_html_repr_shows_only_sql_by_default(tmp_path: Path) -> None:
+    query: dk.Query = dk.SELECT(dk.col.close).FROM(dk.TABLE(tmp_path.joinpath("missing.parquet")))
+    assert "<table" not in query._repr_html_()
+
+
+def test_html_repr_previews_rows_when_enabled(tmp_path: Path, preview: None) -> None:
+    path: Path = tmp_path.joinpath("prices.parquet")
+    pl.DataFrame({"close": [1.0, 2.0]}).write_parquet(path)
+    assert "<table" in dk.SELECT(dk.col.close).FROM(dk.TABLE(path))._repr_html_()
+
+
+def test_html_repr_falls_back_to_sql_when_the_preview_fails(
+    tmp_path: Path, preview: None
+) -> None:
+    query: dk.Query = dk.SELECT(dk.col.close).FROM(dk.TABLE(tmp_path.joinpath("missing.parquet")))
+    html: str = query._repr_html_()
+    assert "missing.parquet" in html
+    assert "<table" not in html
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import polars as pl
+
+import ducktyped as dk
+
+
+def test_cached_statement_sees_a_rewritten_schema(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("data.parquet")
+    pl.DataFrame({"a": [1, 2]}).write_parquet(path)
+    query: dk.Query = dk.SELECT(dk.all()).FROM(dk.TABLE(path))
+    assert query.execute_to_pl().columns == ["a"]
+    pl.DataFrame({"a": [3, 4, 5], "b": ["x", "y", "z"]}).write_parquet(path)
+    result: pl.DataFrame = query.execute_to_pl()
+    assert result.columns == ["a", "b"]
+    assert result.get_column("a").to_list() == [3, 4, 5]
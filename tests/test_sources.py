@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import ducktyped as dk
+
+
+def test_join_sees_files_added_to_the_joined_directory(tmp_path: Path) -> None:
+    trades_path: Path = tmp_path.joinpath("trades.parquet")
+    pl.DataFrame({"ticker": ["SPY", "QQQ"], "size": [10, 20]}).write_parquet(trades_path)
+    names: Path = tmp_path.joinpath("names")
+    names.mkdir()
+    pl.DataFrame({"ticker": ["SPY"], "label": ["S&P 500"]}).write_parquet(
+        names.joinpath("spy.parquet")
+    )
+    trades: dk.TABLE = dk.TABLE(trades_path)
+    labels: dk.TABLE = dk.TABLE(names)
+    query: dk.Query = (
+        dk.SELECT(trades.col("ticker"), labels.col("label"))
+        .FROM(trades)
+        .INNER_JOIN(labels, on=trades.col("ticker").eq(labels.col("ticker")))
+    )
+    assert query.execute_to_pl().height == 1
+    pl.DataFrame({"ticker": ["QQQ"], "label": ["Nasdaq 100"]}).write_parquet(
+        names.joinpath("qqq.parquet")
+    )
+    assert sorted(query.execute_to_pl().get_column("label").to_list()) == [
+        "Nasdaq 100",
+        "S&P 500",
+    ]
+
+
+def test_glob_lists_matching_files(tmp_path: Path) -> None:
+    for month in ("2024-01", "2024-02", "2025-01"):
+        partition: Path = tmp_path.joinpath(f"month={month}")
+        partition.mkdir()
+        pl.DataFrame({"close": [1.0]}).write_parquet(partition.joinpath("data.parquet"))
+    prices: dk.TABLE = dk.TABLE(tmp_path.joinpath("month=2024-*", "*.parquet"))
+    assert [file.parent.name for file in prices.files()] == ["month=2024-01", "month=2024-02"]
+
+
+def test_mixed_suffixes_are_rejected(tmp_path: Path) -> None:
+    frame: pl.DataFrame = pl.DataFrame({"close": [1.0, 2.0]})
+    frame.write_parquet(tmp_path.joinpath("a.parquet"))
+    frame.write_csv(tmp_path.joinpath("b.csv"))
+    with pytest.raises(ValueError, match="different suffixes"):
+        dk.SELECT(dk.col.close).FROM(dk.TABLE(tmp_path)).execute_to_pl()
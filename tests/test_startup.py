@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES: tuple[str, ...] = ("duckdb", "polars", "pyarrow", "numpy")
+
+SCRIPT: str = f"""
+import sys
+from pathlib import Path
+
+import ducktyped as dk
+
+prices = dk.TABLE(Path(sys.argv[1]))
+query = (
+    dk.SELECT(dk.col.ticker, dk.col.close.mean().alias("mean"))
+    .FROM(prices)
+    .WHERE(dk.col.close.gt(1))
+    .GROUP_BY(dk.col.ticker)
+)
+query.explain()
+print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_import_and_explain_do_not_load_heavy_modules(tmp_path: Path) -> None:
+    result: subprocess.CompletedProcess[str] = subprocess.run(
+        [sys.executable, "-c", SCRIPT, str(tmp_path.joinpath("prices.parquet"))],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,65 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+import ducktyped as dk
+
+
+def _write_decimals(path: Path, values: list[str]) -> None:
+    pl.DataFrame(
+        {"amount": pl.Series([Decimal(value) for value in values], dtype=pl.Decimal(10, 2))}
+    ).write_parquet(path)
+
+
+def _write_nanoseconds(path: Path, values: list[str]) -> None:
+    rows: str = " UNION ALL ".join(
+        f"SELECT TIMESTAMP_NS '{value}' AS ts" for value in values
+    )
+    duckdb.sql(query=f"COPY ({rows}) TO '{path}' (FORMAT parquet)")
+
+
+def test_aggregates_on_decimal_columns_fall_back_to_duckdb(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("amounts.parquet")
+    _write_decimals(path=path, values=["1.25", "3.50", "2.00"])
+    amounts: dk.TABLE = dk.TABLE(path)
+    assert dk.SELECT(dk.col.amount.max()).FROM(amounts).execute_scalar() == Decimal("3.50")
+    assert dk.SELECT(dk.col.amount.count()).FROM(amounts).execute_scalar() == 3
+
+
+def test_decimal_predicates_scan_every_file(tmp_path: Path) -> None:
+    _write_decimals(path=tmp_path.joinpath("low.parquet"), values=["1.25", "2.00"])
+    _write_decimals(path=tmp_path.joinpath("high.parquet"), values=["7.50", "9.00"])
+    amounts: dk.TABLE = dk.TABLE(tmp_path)
+    result: pa.Table = (
+        dk.SELECT(dk.col.amount).FROM(amounts).WHERE(dk.col.amount.gt(5)).execute_to_arrow()
+    )
+    assert sorted(result.column("amount").to_pylist()) == [Decimal("7.50"), Decimal("9.00")]
+
+
+def test_aggregates_on_nanosecond_timestamps_fall_back_to_duckdb(tmp_path: Path) -> None:
+    path: Path = tmp_path.joinpath("events.parquet")
+    _write_nanoseconds(
+        path=path, values=["2024-01-01 00:00:00.000000001", "2024-01-02 00:00:00.000000005"]
+    )
+    events: dk.TABLE = dk.TABLE(path)
+    assert dk.SELECT(dk.col.ts.count()).FROM(events).execute_scalar() == 2
+    latest: pl.DataFrame = dk.SELECT(dk.col.ts.max().alias("latest")).FROM(events).execute_to_pl()
+    assert latest.get_column("latest").cast(pl.Int64).item() == 1704153600000000005
+
+
+def test_nanosecond_predicates_scan_every_file(tmp_path: Path) -> None:
+    _write_nanoseconds(
+        path=tmp_path.joinpath("early.parquet"), values=["2024-01-01 00:00:00.000000001"]
+    )
+    _write_nanoseconds(
+        path=tmp_path.joinpath("late.parquet"), values=["2024-03-01 00:00:00.000000001"]
+    )
+    events: dk.TABLE = dk.TABLE(tmp_path)
+    result: pl.DataFrame = (
+        dk.SELECT(dk.col.ts).FROM(events).WHERE(dk.col.ts.gt(datetime(2024, 2, 1))).execute_to_pl()
+    )
+    assert result.height == 1